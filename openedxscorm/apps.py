@@ -0,0 +1,17 @@
+"""
+Django application of the scorm xblock. It stores the scorm data of the "database"
+backend and the references of blocks to the packages that are shared when
+content-addressed storage is enabled. It is installed in Open edX as a plugin
+application.
+"""
+
+from django.apps import AppConfig
+
+
+class ScormXBlockConfig(AppConfig):
+    name = "openedxscorm"
+    verbose_name = "SCORM XBlock"
+    default_auto_field = "django.db.models.BigAutoField"
+
+    # https://github.com/openedx/edx-django-utils/tree/master/edx_django_utils/plugins
+    plugin_app = {}
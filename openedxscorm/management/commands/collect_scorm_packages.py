@@ -0,0 +1,61 @@
+"""
+Remove the previous packages of scorm blocks that were retired for longer than the
+retention period.
+"""
+
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ...models import RetiredPackage
+from ...scormxblock import ModuleStoreEnum, modulestore
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove the previous packages of scorm blocks once they were retired for longer "
+        "than the PACKAGE_RETENTION_PERIOD. Packages are otherwise only removed when a "
+        "new package is uploaded to the same block, so this command should be run "
+        "periodically, for instance daily. Blocks are not modified."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "course_ids",
+            nargs="*",
+            help="Only collect the packages of these courses (default: all courses)",
+        )
+
+    def handle(self, *args, **options):
+        if modulestore is None:
+            raise CommandError("This command can only be run from the Open edX platform")
+        # pylint: disable=import-outside-toplevel
+        from opaque_keys.edx.keys import CourseKey, UsageKey
+        from xmodule.modulestore.exceptions import ItemNotFoundError
+
+        course_keys = [
+            CourseKey.from_string(course_id) for course_id in options["course_ids"]
+        ]
+        expired_packages = RetiredPackage.objects.filter(
+            expires_at__lte=timezone.now()
+        ).order_by("usage_key")
+        store = modulestore()
+        count = 0
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            for usage_key, retired_packages in groupby(
+                expired_packages, key=lambda retired_package: retired_package.usage_key
+            ):
+                usage_key = UsageKey.from_string(usage_key)
+                if course_keys and usage_key.course_key not in course_keys:
+                    continue
+                # Blocks are only loaded to find the storage of their packages
+                try:
+                    block = store.get_item(usage_key)
+                except ItemNotFoundError:
+                    self.stderr.write(f"Skipping the packages of missing block {usage_key}")
+                    continue
+                retired_packages = list(retired_packages)
+                block.remove_retired_packages(retired_packages)
+                count += len(retired_packages)
+        self.stdout.write(f"Removed {count} retired scorm packages")
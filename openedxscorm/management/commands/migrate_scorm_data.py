@@ -0,0 +1,47 @@
+"""
+Move the scorm data of learners from StudentModule.state blobs to the table of the
+"database" scorm data backend.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...scorm_data import DatabaseScormData
+from ...scormxblock import StudentModule
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the scorm data of learners from the scorm_data field to the table of the "
+        "database backend. Learners who already have data in the table are skipped, and "
+        "their legacy data is discarded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of StudentModule rows that are fetched at once",
+        )
+
+    def handle(self, *args, **options):
+        if StudentModule is None:
+            raise CommandError("This command can only be run from the Open edX platform")
+        modules = StudentModule.objects.filter(
+            module_type="scorm", state__contains='"scorm_data"'
+        )
+        count = 0
+        for module in modules.iterator(chunk_size=options["batch_size"]):
+            state = json.loads(module.state)
+            scorm_data = state.get("scorm_data")
+            if not scorm_data:
+                continue
+            DatabaseScormData(
+                module.student_id, str(module.module_state_key), legacy_data=scorm_data
+            ).migrate()
+            module.state = json.dumps(state)
+            module.save(update_fields=["state"])
+            count += 1
+        self.stdout.write(f"Migrated the scorm data of {count} learners")
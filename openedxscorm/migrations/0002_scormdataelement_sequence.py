@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("openedxscorm", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scormdataelement",
+            name="session",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="scormdataelement",
+            name="sequence",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
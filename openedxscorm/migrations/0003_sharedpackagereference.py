@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("openedxscorm", "0002_scormdataelement_sequence"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SharedPackageReference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha1", models.CharField(max_length=40)),
+                ("usage_key", models.CharField(max_length=255)),
+            ],
+            options={
+                "unique_together": {("sha1", "usage_key")},
+            },
+        ),
+    ]
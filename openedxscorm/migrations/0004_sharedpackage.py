@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("openedxscorm", "0003_sharedpackagereference"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SharedPackage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha1", models.CharField(max_length=40, unique=True)),
+            ],
+        ),
+    ]
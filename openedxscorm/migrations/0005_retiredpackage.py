@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("openedxscorm", "0004_sharedpackage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RetiredPackage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("usage_key", models.CharField(max_length=255)),
+                ("path", models.CharField(max_length=255)),
+                ("sha1", models.CharField(max_length=40)),
+                ("content_addressed", models.BooleanField(default=False)),
+                ("retired_at", models.DateTimeField()),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "unique_together": {("usage_key", "path")},
+            },
+        ),
+    ]
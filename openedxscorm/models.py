@@ -0,0 +1,79 @@
+"""
+Database models of the scorm xblock.
+"""
+
+from django.conf import settings
+from django.db import models
+
+from .scorm_data import MAX_SESSION_LENGTH
+
+
+class ScormDataElement(models.Model):
+    """
+    Value of a single CMI element of a learner, in a scorm xblock. Values are stored as
+    json-encoded strings, along with the session and sequence number of the batch of
+    values that last wrote them.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    usage_key = models.CharField(max_length=255)
+    element = models.CharField(max_length=255)
+    value = models.TextField()
+    session = models.CharField(max_length=MAX_SESSION_LENGTH, blank=True, default="")
+    sequence = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("user", "usage_key", "element")
+
+    def __str__(self):
+        return f"{self.usage_key} {self.user_id} {self.element}"
+
+
+class SharedPackageReference(models.Model):
+    """
+    Reference of a scorm xblock to a package that is shared with other blocks, when
+    content-addressed storage is enabled. Shared packages are removed once they are no
+    longer referenced.
+    """
+
+    sha1 = models.CharField(max_length=40)
+    usage_key = models.CharField(max_length=255)
+
+    class Meta:
+        unique_together = ("sha1", "usage_key")
+
+    def __str__(self):
+        return f"{self.sha1} {self.usage_key}"
+
+
+class SharedPackage(models.Model):
+    """
+    Package that is shared by scorm xblocks, when content-addressed storage is enabled.
+    Its row is locked while references to the package are added or released, such that
+    the package is not removed while another block starts using it.
+    """
+
+    sha1 = models.CharField(max_length=40, unique=True)
+
+    def __str__(self):
+        return self.sha1
+
+
+class RetiredPackage(models.Model):
+    """
+    Previous package of a scorm xblock, which is kept after a new package was uploaded
+    to the block, until it expires at the end of the retention period.
+    """
+
+    usage_key = models.CharField(max_length=255)
+    path = models.CharField(max_length=255)
+    sha1 = models.CharField(max_length=40)
+    content_addressed = models.BooleanField(default=False)
+    retired_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("usage_key", "path")
+
+    def __str__(self):
+        return f"{self.usage_key} {self.path}"
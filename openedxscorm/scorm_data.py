@@ -0,0 +1,360 @@
+"""
+Backends that store the scorm data of learners, i.e: the values of their CMI elements.
+
+The backend is selected by the SCORM_DATA_BACKEND setting, which is a function (or the
+import path of a function) that takes the xblock, the learner id and the `scorm_data`
+field of that learner as arguments, and returns a backend instance.
+"""
+
+import base64
+import binascii
+from contextlib import contextmanager
+import json
+import zlib
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Q
+
+# Prefix of the string values that are stored compressed
+COMPRESSED_VALUE_PREFIX = "zlib+base64:"
+# Bounds of the session ids and sequence numbers of batches, as stored in the database
+MAX_SESSION_LENGTH = 64
+MAX_SEQUENCE = 2147483647
+
+
+class FieldScormData:
+    """
+    Store scorm data in the `scorm_data` user state field of the xblock. This is the
+    default backend: the whole scorm data of a learner is serialized in a single
+    StudentModule.state blob.
+    """
+
+    # The whole field is saved at once, so concurrent writes would overwrite one another
+    concurrent_writes = False
+
+    def __init__(self, scorm_data):
+        self.scorm_data = scorm_data
+
+    def get(self, name, default=""):
+        return self.scorm_data.get(name, default)
+
+    def get_all(self):
+        return dict(self.scorm_data)
+
+    def get_many(self, prefixes):
+        return {
+            name: value
+            for name, value in self.scorm_data.items()
+            if matches_prefixes(name, prefixes)
+        }
+
+    def set(self, name, value):
+        self.scorm_data[name] = value
+
+    def save(self):
+        # Field data is saved by the runtime
+        pass
+
+    @contextmanager
+    def write(self, session=None, sequence=None, names=()):
+        """
+        Context in which values are set and then saved. Writes of a session are
+        ordered by the client, so no value is stale.
+        """
+        try:
+            yield set()
+        finally:
+            self.save()
+
+
+class DatabaseScormData:
+    """
+    Store scorm data in a dedicated table, with one row per (learner, xblock, element).
+    Values are buffered by `set` and only the elements whose value changed are written
+    by `save`.
+
+    Every row also stores the session and sequence number of the batch that last
+    wrote it, such that the client can send several batches concurrently: writes
+    from an older batch of the same session are rejected. Rows are not locked: instead,
+    rows are only written if they were not written by a more recent batch of the same
+    session, which also holds for rows that are created concurrently.
+
+    Legacy data that was stored in the `scorm_data` field is moved to the table on
+    first access, unless the learner already has rows in the table. The `legacy_data`
+    dict is then cleared, such that it is emptied by the next save of the field data.
+    """
+
+    concurrent_writes = True
+
+    def __init__(self, user_id, usage_key, legacy_data=None):
+        self.user_id = user_id
+        self.usage_key = usage_key
+        self.legacy_data = legacy_data
+        self.values = None
+        self.changes = {}
+        self.migrated = False
+        self.session = ""
+        self.sequence = None
+        # Stored values that do not need to be written again
+        self.baseline = {}
+
+    def get(self, name, default=""):
+        if name in self.changes:
+            return self.changes[name]
+        if self.values is not None:
+            return self.values.get(name, default)
+        self.migrate()
+        value = (
+            self.queryset().filter(element=name).values_list("value", flat=True).first()
+        )
+        return default if value is None else json.loads(value)
+
+    def get_all(self):
+        if self.values is None:
+            self.migrate()
+            self.values = {
+                element: json.loads(value)
+                for element, value in self.queryset().values_list("element", "value")
+            }
+        values = dict(self.values)
+        values.update(self.changes)
+        return values
+
+    def get_many(self, prefixes):
+        if self.values is not None:
+            values = self.values
+        else:
+            self.migrate()
+            condition = Q(pk__in=[])
+            for prefix in prefixes:
+                condition |= Q(element=prefix) | Q(element__startswith=prefix + ".")
+            values = {
+                element: json.loads(value)
+                for element, value in self.queryset()
+                .filter(condition)
+                .values_list("element", "value")
+            }
+        values = dict(values)
+        values.update(self.changes)
+        return {
+            name: value
+            for name, value in values.items()
+            if matches_prefixes(name, prefixes)
+        }
+
+    def set(self, name, value):
+        self.changes[name] = value
+
+    def save(self):
+        self.migrate()
+        changes = {
+            name: value
+            for name, value in self.changes.items()
+            if name not in self.baseline or self.baseline[name] != value
+        }
+        self.upsert(changes)
+        if self.values is not None:
+            self.values.update(self.changes)
+        self.changes = {}
+
+    @contextmanager
+    def write(self, session=None, sequence=None, names=()):
+        """
+        Context in which values of a batch are set and then saved. The context value
+        is the set of element names that were written by a more recent batch of the
+        same session: these values are stale and they should not be set. Rows that are
+        written concurrently by a more recent batch are not overwritten when saving.
+        """
+        with transaction.atomic():
+            self.migrate()
+            self.session = session or ""
+            self.sequence = sequence
+            stale = set()
+            self.baseline = {}
+            for element, value, row_session, row_sequence in (
+                self.queryset()
+                .filter(element__in=names)
+                .values_list("element", "value", "session", "sequence")
+            ):
+                if sequence is None:
+                    self.baseline[element] = json.loads(value)
+                elif row_session == self.session and row_sequence is not None:
+                    if row_sequence > sequence:
+                        stale.add(element)
+                    elif row_sequence == sequence:
+                        # This batch was sent again
+                        self.baseline[element] = json.loads(value)
+            try:
+                yield stale
+            finally:
+                self.save()
+
+    def migrate(self):
+        """
+        Move legacy data from the `scorm_data` field to the table, once.
+        """
+        if self.migrated:
+            return
+        self.migrated = True
+        if not self.legacy_data:
+            return
+        if not self.queryset().exists():
+            self.upsert(self.legacy_data)
+        self.legacy_data.clear()
+
+    def upsert(self, values):
+        if not values:
+            return
+        model = get_model()
+        if (
+            self.sequence is not None
+            or not connections[
+                router.db_for_write(model)
+            ].features.supports_update_conflicts_with_target
+        ):
+            # Rows of batches are only written if they were not written by a more recent
+            # batch. Also, some databases, such as MySQL, cannot upsert on a given set
+            # of unique fields. Then, rows are updated, and created when they do not
+            # exist yet.
+            for name, value in values.items():
+                self.update_or_create(name, value)
+            return
+        model.objects.bulk_create(
+            [
+                model(
+                    user_id=self.user_id,
+                    usage_key=self.usage_key,
+                    element=name,
+                    value=json.dumps(value),
+                    session=self.session,
+                    sequence=self.sequence,
+                )
+                for name, value in values.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "usage_key", "element"],
+            update_fields=["value", "session", "sequence"],
+        )
+
+    def update_or_create(self, name, value):
+        fields = {
+            "value": json.dumps(value),
+            "session": self.session,
+            "sequence": self.sequence,
+        }
+        rows = self.queryset().filter(element=name)
+        if self.sequence is not None:
+            rows = rows.exclude(session=self.session, sequence__gt=self.sequence)
+        if rows.update(**fields):
+            return
+        try:
+            with transaction.atomic():
+                get_model().objects.create(
+                    user_id=self.user_id, usage_key=self.usage_key, element=name, **fields
+                )
+        except IntegrityError:
+            # The row exists: it was written by a more recent batch, or it was created
+            # by a concurrent request in the meantime.
+            rows.update(**fields)
+
+    def queryset(self):
+        return get_model().objects.filter(user_id=self.user_id, usage_key=self.usage_key)
+
+
+class CompressedScormData:
+    """
+    Wrap a backend such that large string values, such as `cmi.suspend_data`, are
+    stored compressed. Values are decompressed when they are read. Values that were
+    stored uncompressed are returned as is.
+    """
+
+    def __init__(self, backend, min_size):
+        self.backend = backend
+        self.min_size = min_size
+
+    def get(self, name, default=""):
+        return decompress_value(self.backend.get(name, default))
+
+    def get_all(self):
+        return {
+            name: decompress_value(value)
+            for name, value in self.backend.get_all().items()
+        }
+
+    def get_many(self, prefixes):
+        return {
+            name: decompress_value(value)
+            for name, value in self.backend.get_many(prefixes).items()
+        }
+
+    @property
+    def concurrent_writes(self):
+        return self.backend.concurrent_writes
+
+    def set(self, name, value):
+        self.backend.set(name, compress_value(value, self.min_size))
+
+    def save(self):
+        self.backend.save()
+
+    def write(self, session=None, sequence=None, names=()):
+        return self.backend.write(session=session, sequence=sequence, names=names)
+
+
+def matches_prefixes(name, prefixes):
+    """
+    Return True if the CMI element is one of the prefixes, or if it is a child of one
+    of them. For instance, "cmi.core" matches "cmi.core.lesson_status".
+    """
+    return any(name == prefix or name.startswith(prefix + ".") for prefix in prefixes)
+
+
+def compress_value(value, min_size):
+    """
+    Compress string values that are at least `min_size` characters long. Compression
+    is disabled when `min_size` is 0. Values that already start with the compression
+    prefix are always compressed, such that they are not mistaken for compressed
+    values when they are read.
+    """
+    if not isinstance(value, str):
+        return value
+    is_ambiguous = value.startswith(COMPRESSED_VALUE_PREFIX)
+    if not is_ambiguous and (not min_size or len(value) < min_size):
+        return value
+    compressed = COMPRESSED_VALUE_PREFIX + base64.b64encode(
+        zlib.compress(value.encode("utf8"))
+    ).decode("ascii")
+    if is_ambiguous or len(compressed) < len(value):
+        return compressed
+    return value
+
+
+def decompress_value(value):
+    if not isinstance(value, str) or not value.startswith(COMPRESSED_VALUE_PREFIX):
+        return value
+    try:
+        return zlib.decompress(
+            base64.b64decode(value[len(COMPRESSED_VALUE_PREFIX):], validate=True)
+        ).decode("utf8")
+    except (binascii.Error, zlib.error, UnicodeDecodeError):
+        # This is not a compressed value
+        return value
+
+
+def get_model():
+    # The model is imported lazily because the django app of this package is only
+    # installed when the database backend is used.
+    from .models import ScormDataElement  # pylint: disable=import-outside-toplevel
+
+    return ScormDataElement
+
+
+def field(_xblock, _user_id, scorm_data):
+    return FieldScormData(scorm_data)
+
+
+def database(xblock, user_id, scorm_data):
+    if not isinstance(user_id, int):
+        # Anonymous users, for instance in the workbench, do not have rows in the table
+        return FieldScormData(scorm_data)
+    return DatabaseScormData(user_id, str(xblock.scope_ids.usage_id), legacy_data=scorm_data)
@@ -1,15 +1,26 @@
+import datetime
 import json
 import hashlib
 import os
 import logging
 import re
+import shutil
+import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
 import zipfile
+import zlib
+from collections import OrderedDict
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 import mimetypes
 import urllib
+import uuid
 
-from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
 from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Q
 from django.template import Context, Template
 from django.utils import timezone
@@ -20,8 +31,11 @@ from web_fragments.fragment import Fragment
 from xblock.core import XBlock
 from xblock.completable import CompletableXBlockMixin
 from xblock.exceptions import JsonHandlerError
+from xblock.field_data import DictFieldData
 from xblock.fields import Scope, String, Float, Boolean, Dict, DateTime, Integer
 
+from .scorm_data import MAX_SEQUENCE, MAX_SESSION_LENGTH, CompressedScormData
+
 try:
     # Older Open edX releases (Redwood and earlier) install a backported version of
     # importlib.resources: https://pypi.org/project/importlib-resources/
@@ -31,6 +45,12 @@ except ModuleNotFoundError:
     # https://docs.python.org/3/library/importlib.resources.html#module-importlib.resources
     from importlib import resources as importlib_resources
 
+try:
+    # Brotli compression of assets is optional
+    import brotli
+except ImportError:
+    brotli = None
+
 try:
     try:
         from common.djangoapps.student.models import CourseEnrollment
@@ -42,6 +62,13 @@ except ImportError:
     CourseEnrollment = None
     StudentModule = None
 
+try:
+    from xmodule.modulestore import ModuleStoreEnum
+    from xmodule.modulestore.django import modulestore
+except ImportError:
+    ModuleStoreEnum = None
+    modulestore = None
+
 
 # Make '_' a no-op so we can scrape strings
 def _(text):
@@ -50,6 +77,104 @@ def _(text):
 
 logger = logging.getLogger(__name__)
 OS_PATH_ALT_SEP = '\\'
+# Size of the chunks used to stream proxied assets
+ASSET_CHUNK_SIZE = 64 * 1024
+# Requests with more byte ranges than this are served in full
+MAX_BYTE_RANGES = 16
+# Proxied assets are served with this Cache-Control header, unless the
+# ASSETS_CACHE_CONTROL setting is defined
+DEFAULT_ASSETS_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Fields that are updated when a new package is processed
+PACKAGE_FIELDS = ("package_meta", "index_page_path", "scorm_version", "navigation_menu")
+# Duration (in seconds) after which background package processing is considered as
+# stalled, unless the PACKAGE_PROCESSING_TIMEOUT setting is defined
+DEFAULT_PACKAGE_PROCESSING_TIMEOUT = 3600
+# Minimum duration (in seconds) between two updates of the package processing progress
+PROGRESS_UPDATE_INTERVAL = 1
+# Names of the storage lookups that are cached by the xblock
+STORAGE_LOOKUPS = ("extract_folder_base_path", "index_page_folder")
+# Mime types, other than "text/*", of the assets that can be pre-compressed
+COMPRESSIBLE_MIME_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/x-javascript",
+    "application/xhtml+xml",
+    "application/xml",
+    "image/svg+xml",
+}
+# Content encodings of pre-compressed assets, in order of preference: the file
+# extension of the compressed variant, and the compression function
+ASSET_COMPRESSORS = {}
+if brotli is not None:
+    ASSET_COMPRESSORS["br"] = (".br", lambda: brotli_compressor())
+ASSET_COMPRESSORS["gzip"] = (".gz", lambda: gzip_compressor())
+# Package members with a higher uncompressed/compressed size ratio are rejected,
+# unless the MAX_COMPRESSION_RATIO setting is defined
+DEFAULT_MAX_COMPRESSION_RATIO = 200
+# Package members smaller than this are not checked for their compression ratio
+MIN_COMPRESSION_RATIO_CHECK_SIZE = 1024 * 1024
+# Duration (in seconds) during which previous packages are kept after a new package
+# was uploaded, unless the PACKAGE_RETENTION_PERIOD setting is defined
+DEFAULT_PACKAGE_RETENTION_PERIOD = 7 * 24 * 3600
+# Progress measures are published as completion events only when they changed by at
+# least this much, unless the PROGRESS_COMPLETION_MIN_DELTA setting is defined
+DEFAULT_PROGRESS_COMPLETION_MIN_DELTA = 0.1
+# Number of threads that delete files from storages that do not support bulk deletion
+DELETE_CONCURRENCY = 8
+
+# Values that are set by packages are sent to the server at least once per interval
+DEFAULT_SET_VALUES_FLUSH_INTERVAL = 5
+
+# Number of batches of values that clients may send concurrently, when the scorm data
+# backend supports it
+DEFAULT_MAX_CONCURRENT_SET_VALUES = 4
+
+# CMI elements that are embedded in the student view. Other elements are loaded by the
+# client when they are first accessed. Elements are matched with their children, for
+# instance "cmi.core" matches "cmi.core.lesson_location".
+DEFAULT_EMBEDDED_SCORM_DATA = [
+    # SCORM 1.2
+    "cmi.core",
+    "cmi.suspend_data",
+    "cmi.launch_data",
+    "cmi.comments",
+    "cmi.student_data",
+    "cmi.student_preference",
+    # SCORM 2004
+    "cmi.completion_status",
+    "cmi.completion_threshold",
+    "cmi.credit",
+    "cmi.entry",
+    "cmi.exit",
+    "cmi.learner_preference",
+    "cmi.location",
+    "cmi.max_time_allowed",
+    "cmi.progress_measure",
+    "cmi.scaled_passing_score",
+    "cmi.score",
+    "cmi.success_status",
+    "cmi.time_limit_action",
+    "cmi.total_time",
+    # Packages commonly read these counts on startup, to resume where they left off
+    "cmi.objectives._count",
+    "cmi.interactions._count",
+    "cmi.comments_from_learner._count",
+    "cmi.comments_from_lms._count",
+]
+# Smaller responses of the scorm_get_values handler are not compressed
+MIN_COMPRESSED_RESPONSE_SIZE = 1024
+
+# String values of CMI elements that are at least this long are stored compressed
+DEFAULT_SCORM_DATA_COMPRESSION_MIN_SIZE = 4096
+# Decoded static resources and compiled templates, shared by all the xblocks of the
+# process, unless the CACHE_RESOURCES setting is False
+RESOURCES_CACHE = {}
+RESOURCES_CACHE_LOCK = threading.Lock()
+# Asset indexes of large packages are too large for the shared cache (e.g: memcached
+# items are limited to 1 MB), so the most recently used ones are kept by each process
+ASSET_INDEX_CACHE = OrderedDict()
+ASSET_INDEX_CACHE_LOCK = threading.Lock()
+ASSET_INDEX_CACHE_SIZE = 32
 
 
 @XBlock.wants("settings")
@@ -78,6 +203,8 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
     success_status = String(scope=Scope.user_state, default="unknown")
 
     lesson_score = Float(scope=Scope.user_state, default=0)
+    # Last completion that was published, used to throttle progress measure events
+    last_completion = Float(scope=Scope.user_state, default=None)
     weight = Float(
         default=1,
         display_name=_("Weight"),
@@ -147,8 +274,10 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
     has_author_view = True
 
     def render_template(self, template_path, context):
-        template_str = self.resource_string(template_path)
-        template = Template(template_str)
+        template = self.cached_resource(
+            ("template", template_path),
+            lambda: Template(self.resource_string(template_path)),
+        )
         return template.render(Context(context))
 
     def get_current_user_attr(self, attr: str):
@@ -157,14 +286,19 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
     def get_current_user(self):
         return self.runtime.service(self, "user").get_current_user()
 
-    def initialize_student_info(self):
+    def get_learner_values(self):
+        """
+        Return the values of the CMI elements that identify the current learner. They
+        are computed on every request, and not stored in scorm_data.
+        """
         user_id = self.get_current_user_attr("edx-platform.user_id")
         username = self.get_current_user_attr("edx-platform.username")
-        
-        self.scorm_data["cmi.core.student_id"] = user_id
-        self.scorm_data["cmi.learner_id"] = user_id
-        self.scorm_data["cmi.learner_name"] = username
-        self.scorm_data["cmi.core.student_name"] = username
+        return {
+            "cmi.core.student_id": user_id,
+            "cmi.learner_id": user_id,
+            "cmi.learner_name": username,
+            "cmi.core.student_name": username,
+        }
 
     @staticmethod
     def resource_string(path):
@@ -175,11 +309,39 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
             data = importlib_resources.files(__package__).joinpath(path).read_bytes()
         return data.decode("utf8")
 
+    def static_resource(self, path):
+        """
+        Cached version of `resource_string`.
+        """
+        return self.cached_resource(("resource", path), lambda: self.resource_string(path))
+
+    def cached_resource(self, key, load):
+        """
+        Return the resource that is loaded by the `load` function, cached process-wide.
+        Resources are not cached if the CACHE_RESOURCES setting is False, such that
+        changes are picked up without restarting, in development.
+        """
+        if not self.xblock_settings.get("CACHE_RESOURCES", True):
+            return load()
+        try:
+            return RESOURCES_CACHE[key]
+        except KeyError:
+            pass
+        with RESOURCES_CACHE_LOCK:
+            if key not in RESOURCES_CACHE:
+                RESOURCES_CACHE[key] = load()
+            return RESOURCES_CACHE[key]
+
     def author_view(self, context=None):
         context = context or {}
         if not self.index_page_path:
             context["message"] = "Click 'Edit' to modify this module and upload a new SCORM package."
         context["can_view_student_reports"] = True
+        if self.package_meta.get("content_addressed"):
+            # Blocks that are copied without any studio hook, for instance in course
+            # reruns, reference their shared package once they are displayed in the
+            # studio.
+            self.add_package_reference(self.package_meta["sha1"])
         return self.student_view(context=context)
 
     def student_view(self, context=None):
@@ -189,17 +351,29 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
             "grade": self.get_grade(),
             "can_view_student_reports": self.can_view_student_reports,
             "scorm_xblock": self,
-            "navigation_menu": self.navigation_menu,
+            "navigation_menu": (
+                self.get_navigation_menu()
+                if self.enable_navigation_menu and not self.popup_on_launch
+                else ""
+            ),
             "popup_on_launch": self.popup_on_launch,
         }
         student_context.update(context or {})
-        self.initialize_student_info()
+        # Rendering the block should not modify the learner state, such that it is not saved
+        embedded_scorm_data = self.xblock_settings.get(
+            "EMBEDDED_SCORM_DATA", DEFAULT_EMBEDDED_SCORM_DATA
+        )
+        if embedded_scorm_data is None:
+            scorm_data = self.scorm_data_backend.get_all()
+        else:
+            scorm_data = self.scorm_data_backend.get_many(embedded_scorm_data)
+        scorm_data.update(self.get_learner_values())
         template = self.render_template("static/html/scormxblock.html", student_context)
         frag = Fragment(template)
-        frag.add_css(self.resource_string("static/css/scormxblock.css"))
-        frag.add_javascript(self.resource_string("static/js/src/scorm.js"))
-        frag.add_javascript(self.resource_string("static/js/src/scormxblock.js"))
-        frag.add_javascript(self.resource_string("static/js/vendor/renderjson.js"))
+        frag.add_css(self.static_resource("static/css/scormxblock.css"))
+        frag.add_javascript(self.static_resource("static/js/src/scorm.js"))
+        frag.add_javascript(self.static_resource("static/js/src/scormxblock.js"))
+        frag.add_javascript(self.static_resource("static/js/vendor/renderjson.js"))
         frag.initialize_js(
             "ScormXBlock",
             json_args={
@@ -207,7 +381,25 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
                 "popup_on_launch": self.popup_on_launch,
                 "popup_width": self.width or 800,
                 "popup_height": self.height or 800,
-                "scorm_data": self.scorm_data,
+                "scorm_data": scorm_data,
+                "embedded_scorm_data": embedded_scorm_data,
+                "authoritative_values": self.get_authoritative_values(),
+                "set_values_flush_interval": parse_float(
+                    self.xblock_settings.get(
+                        "SET_VALUES_FLUSH_INTERVAL", DEFAULT_SET_VALUES_FLUSH_INTERVAL
+                    ),
+                    DEFAULT_SET_VALUES_FLUSH_INTERVAL,
+                ),
+                "max_set_values_requests": (
+                    parse_int(
+                        self.xblock_settings.get(
+                            "MAX_CONCURRENT_SET_VALUES", DEFAULT_MAX_CONCURRENT_SET_VALUES
+                        ),
+                        DEFAULT_MAX_CONCURRENT_SET_VALUES,
+                    )
+                    if self.scorm_data_backend.concurrent_writes
+                    else 1
+                ),
                 "block_height": self.height or 450,
             },
         )
@@ -230,14 +422,106 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         -------
         Response object containing the content of the requested file with the appropriate content type.
         """
-        file_name = os.path.basename(suffix)
-        file_path = self.find_file_path(file_name)        
-        file_type, _ = mimetypes.guess_type(file_name)
-        with self.storage.open(file_path) as response:
-            file_content = response.read()
-
-
-        return Response(file_content, content_type=file_type)
+        package_sha1 = self.package_meta.get("sha1", "")
+        # Asset urls are prefixed by the package sha1, such that their content never
+        # changes and can be cached forever. Urls without this prefix (for instance from
+        # navigation menus generated by previous versions of this xblock) must be
+        # revalidated by the browser.
+        folder, _, path = suffix.partition("/")
+        extract_folder_path = None
+        last_modified = self.package_last_modified
+        if package_sha1 and folder == package_sha1:
+            suffix = path
+            cache_control = self.xblock_settings.get(
+                "ASSETS_CACHE_CONTROL", DEFAULT_ASSETS_CACHE_CONTROL
+            )
+        else:
+            # Learners who loaded a previous version of the package keep using it until
+            # it is removed.
+            extract_folder_path = self.find_retired_package(folder)
+            if extract_folder_path is not None:
+                package_sha1 = folder
+                suffix = path
+                last_modified = None
+                cache_control = self.xblock_settings.get(
+                    "ASSETS_CACHE_CONTROL", DEFAULT_ASSETS_CACHE_CONTROL
+                )
+            else:
+                cache_control = "private, no-cache"
+        etag = hashlib.sha1(f"{package_sha1}/{suffix}".encode()).hexdigest()
+        # Each pre-compressed variant of an asset has its own etag
+        etags = [etag] + [f"{etag}-{encoding}" for encoding in ASSET_COMPRESSORS]
+
+        if is_not_modified(request, etags, last_modified):
+            response = Response(status=304)
+            etag = next((e for e in etags if e in request.if_none_match), etag)
+        else:
+            asset = self.find_asset(suffix, extract_folder_path)
+            if asset is None:
+                return Response(status=404)
+            file_type, _ = mimetypes.guess_type(os.path.basename(suffix))
+            encoding = select_content_encoding(
+                request.headers.get("Accept-Encoding"), asset.get("encodings")
+            )
+            if encoding:
+                asset = asset["encodings"][encoding]
+                etag = f"{etag}-{encoding}"
+            size = asset["size"]
+            if size is None:
+                size = self.storage.size(asset["key"])
+            response = self.asset_response(request, asset["key"], size, file_type, etag)
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.headers["ETag"] = f'"{etag}"'
+        response.headers["Cache-Control"] = cache_control
+        response.headers["Vary"] = "Accept-Encoding"
+        if last_modified:
+            response.last_modified = last_modified
+        return response
+
+    def asset_response(self, request, path, size, content_type, etag):
+        """
+        Stream the content of a stored file, in full or in part, depending on the "Range"
+        header of the request. The file is never loaded entirely in memory.
+        """
+        response = Response(content_type=content_type, conditional_response=False)
+        response.accept_ranges = "bytes"
+        range_header = request.headers.get("Range")
+        if request.headers.get("If-Range", f'"{etag}"') != f'"{etag}"':
+            # The client has a different version of the asset: send it in full
+            range_header = None
+        byte_ranges = parse_byte_ranges(range_header, size)
+        if byte_ranges is None:
+            response.app_iter = iter_file_parts(self.storage, path, [(0, size)])
+            response.content_length = size
+        elif not byte_ranges:
+            response.status = 416
+            response.headers["Content-Range"] = f"bytes */{size}"
+            response.content_length = 0
+        elif len(byte_ranges) == 1:
+            start, end = byte_ranges[0]
+            response.status = 206
+            response.content_range = (start, end, size)
+            response.app_iter = iter_file_parts(self.storage, path, byte_ranges)
+            response.content_length = end - start
+        else:
+            boundary = uuid.uuid4().hex
+            parts = []
+            for start, end in byte_ranges:
+                part_headers = f"\r\n--{boundary}\r\n"
+                if content_type:
+                    part_headers += f"Content-Type: {content_type}\r\n"
+                part_headers += f"Content-Range: bytes {start}-{end - 1}/{size}\r\n\r\n"
+                parts += [part_headers.encode(), (start, end)]
+            parts.append(f"\r\n--{boundary}--\r\n".encode())
+            response.status = 206
+            response.content_type = f"multipart/byteranges; boundary={boundary}"
+            response.app_iter = iter_file_parts(self.storage, path, parts)
+            response.content_length = sum(
+                len(part) if isinstance(part, bytes) else part[1] - part[0]
+                for part in parts
+            )
+        return response
 
     def studio_view(self, context=None):
         # Note that we cannot use xblockutils's StudioEditableXBlockMixin because we
@@ -258,9 +542,18 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         studio_context.update(context or {})
         template = self.render_template("static/html/studio.html", studio_context)
         frag = Fragment(template)
-        frag.add_css(self.resource_string("static/css/scormxblock.css"))
-        frag.add_javascript(self.resource_string("static/js/src/studio.js"))
-        frag.initialize_js("ScormStudioXBlock")
+        frag.add_css(self.static_resource("static/css/scormxblock.css"))
+        frag.add_javascript(self.static_resource("static/js/src/studio.js"))
+        # If a package is still being processed, the studio resumes polling for its
+        # status.
+        state = self.get_processing_state()
+        frag.initialize_js(
+            "ScormStudioXBlock",
+            json_args={
+                "package_processing": state is not None
+                and state["status"] in ["pending", "processing"],
+            },
+        )
         return frag
 
     @staticmethod
@@ -290,20 +583,349 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
             return self.json_response(response)
 
         package_file = request.params["file"].file
-        self.update_package_meta(package_file)
 
-        # Clean storage folder, if it already exists
-        self.clean_storage()
+        executor = self.package_processing_executor
+        if executor is not None:
+            # Process the package in the background. The studio will poll the
+            # package_processing_status handler until processing is complete.
+            package_meta = self.get_package_meta(package_file)
+            package_path = os.path.join(
+                self.scorm_location(),
+                "uploads",
+                f"{self.hashed_usage_id}-{package_meta['sha1']}.zip",
+            )
+            if self.storage.exists(package_path):
+                self.storage.delete(package_path)
+            package_path = self.storage.save(package_path, File(package_file))
+            job_id = uuid.uuid4().hex
+            self.set_processing_state(
+                {
+                    "id": job_id,
+                    "status": "pending",
+                    "errors": [],
+                    "started_at": int(time.time()),
+                }
+            )
+            # Processing starts once the studio saved the other fields of the block,
+            # at the end of the request, such that they are not overwritten.
+            transaction.on_commit(
+                lambda: executor(self, job_id, package_meta, package_path)
+            )
+            response["processing"] = True
+            return self.json_response(response)
 
-        # Extract zip file
+        # Extract zip file alongside the current package, which remains live until
+        # the new package is ready.
         try:
-            self.extract_package(package_file)
-            self.update_package_fields()
+            fields = self.prepare_package(package_file, self.get_package_meta(package_file))
         except ScormError as e:
             response["errors"].append(e.args[0])
+        else:
+            self.apply_package_fields(fields)
 
         return self.json_response(response)
 
+    @property
+    def package_processing_executor(self):
+        """
+        Return the function that runs package processing in the background, or None if
+        packages should be processed synchronously, in the upload request.
+        """
+        executor = self.xblock_settings.get("PACKAGE_PROCESSING_EXECUTOR")
+        if isinstance(executor, string_types):
+            executor = import_string(executor)
+        return executor
+
+    def prepare_package(self, package_file, package_meta, progress=None):
+        """
+        Extract a new package and return the block fields that correspond to it. The
+        package is processed by a copy of this block, such that the current package
+        remains live until the new fields are applied by `apply_package_fields`.
+        """
+        block = self.runtime.construct_xblock_from_class(
+            type(self),
+            self.scope_ids,
+            field_data=DictFieldData({"package_meta": package_meta}),
+        )
+        manifest = block.extract_package(
+            package_file,
+            progress=progress,
+            previous_asset_index=self.get_reusable_asset_index(),
+        )
+        try:
+            block.update_package_fields(manifest)
+        except Exception:
+            # Do not leave invalid packages behind
+            self.discard_package(package_meta)
+            raise
+        return {name: getattr(block, name) for name in PACKAGE_FIELDS}
+
+    def discard_package(self, package_meta):
+        """
+        Remove a package that was extracted by `prepare_package` but that will not be
+        applied, unless the block still uses it.
+        """
+        sha1 = package_meta["sha1"]
+        if sha1 == self.package_meta.get("sha1") or self.find_retired_package(sha1):
+            return
+        if package_meta["content_addressed"]:
+            self.release_shared_package(sha1)
+        else:
+            self.remove_package(os.path.join(self.extract_folder_base_path, sha1))
+
+    def apply_package_fields(self, fields):
+        """
+        Switch the block to a new package that was extracted by `prepare_package`. The
+        previous package is retired, and it will be removed once the retention period is
+        over.
+        """
+        previous_package_meta = dict(self.package_meta)
+        previous_extract_folder_path = None
+        if previous_package_meta.get("sha1"):
+            if not previous_package_meta.get("content_addressed") and self.storage.exists(
+                os.path.join(self.extract_folder_base_path, "imsmanifest.xml")
+            ):
+                # Packages that were extracted by the earliest versions of this xblock
+                # are stored directly in the base folder, where the new package is
+                # extracted as well, and they are removed right away.
+                self.clean_storage(keep_sha1=fields["package_meta"]["sha1"])
+            else:
+                previous_extract_folder_path = self.extract_folder_path
+
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.invalidate_storage_lookups()
+
+        # The package might have been retired by a previous upload
+        self.unretire_package(self.extract_folder_path)
+        if previous_extract_folder_path not in (None, self.extract_folder_path):
+            self.retire_package(previous_extract_folder_path, previous_package_meta)
+        # Expired packages are removed in the background, and not in the upload request
+        expired_packages = self.collect_retired_packages()
+        if expired_packages:
+            PACKAGE_PROCESSING_POOL.submit(self.remove_retired_packages, expired_packages)
+
+    def retire_package(self, extract_folder_path, package_meta):
+        """
+        Record that a previous package of this block is retired. Previous packages are
+        not removed immediately, such that learners who are using them, and the
+        published version of this block, are not affected when a new package is
+        uploaded. Retired packages are stored in the database, and not in the block, such
+        that they can be removed without editing the course.
+        """
+        from .models import RetiredPackage  # pylint: disable=import-outside-toplevel
+
+        retention_period = self.xblock_settings.get(
+            "PACKAGE_RETENTION_PERIOD", DEFAULT_PACKAGE_RETENTION_PERIOD
+        )
+        retired_at = timezone.now()
+        RetiredPackage.objects.update_or_create(
+            usage_key=str(self.scope_ids.usage_id),
+            path=extract_folder_path,
+            defaults={
+                "sha1": package_meta["sha1"],
+                "content_addressed": bool(package_meta.get("content_addressed")),
+                "retired_at": retired_at,
+                "expires_at": retired_at + datetime.timedelta(seconds=retention_period),
+            },
+        )
+        cache.delete(self.retired_package_cache_key(package_meta["sha1"]))
+
+    def unretire_package(self, extract_folder_path):
+        """
+        Forget that a package was retired, because the block uses it again.
+        """
+        from .models import RetiredPackage  # pylint: disable=import-outside-toplevel
+
+        RetiredPackage.objects.filter(
+            usage_key=str(self.scope_ids.usage_id), path=extract_folder_path
+        ).delete()
+        cache.delete(self.retired_package_cache_key(self.package_meta["sha1"]))
+
+    def collect_retired_packages(self):
+        """
+        Return the previous packages of this block that were retired for longer than the
+        retention period, such that they are removed by `remove_retired_packages` on
+        upload. The `collect_scorm_packages` management command removes the expired
+        packages of all blocks.
+        """
+        from .models import RetiredPackage  # pylint: disable=import-outside-toplevel
+
+        return list(
+            RetiredPackage.objects.filter(
+                usage_key=str(self.scope_ids.usage_id), expires_at__lte=timezone.now()
+            )
+        )
+
+    def remove_retired_packages(self, retired_packages):
+        """
+        Remove the retired packages that were returned by `collect_retired_packages`.
+        Packages that the block started using again in the meantime are kept.
+        """
+        from .models import RetiredPackage  # pylint: disable=import-outside-toplevel
+
+        for retired_package in retired_packages:
+            deleted, _ = RetiredPackage.objects.filter(pk=retired_package.pk).delete()
+            if not deleted:
+                continue
+            cache.delete(self.retired_package_cache_key(retired_package.sha1))
+            if retired_package.content_addressed:
+                self.release_shared_package(retired_package.sha1)
+            else:
+                logger.info('Removing retired package "%s"', retired_package.path)
+                self.remove_package(retired_package.path)
+
+    def find_retired_package(self, sha1):
+        """
+        Return the extract folder path of the retired package with this sha1, or None.
+        Results are cached, as this happens on asset requests.
+        """
+        cache_key = self.retired_package_cache_key(sha1)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached["path"]
+        from .models import RetiredPackage  # pylint: disable=import-outside-toplevel
+
+        retired_package = RetiredPackage.objects.filter(
+            usage_key=str(self.scope_ids.usage_id), sha1=sha1
+        ).first()
+        path = None if retired_package is None else retired_package.path
+        cache.set(cache_key, {"path": path}, self.cache_timeout)
+        return path
+
+    def retired_package_cache_key(self, sha1):
+        return f"openedxscorm.retired_package.{self.hashed_usage_id}.{sha1}"
+
+    def process_package(self, job_id, package_meta, package_path):
+        """
+        Extract a package that was uploaded to `package_path` in the storage, and switch
+        the block to this new package. This runs in the background, outside of any studio
+        request, so the block is saved to the modulestore. Packages that are superseded
+        by a more recent upload are removed.
+        """
+        pending_state = self.get_processing_state() or {}
+        state = {
+            "id": job_id,
+            "status": "processing",
+            "errors": [],
+            "started_at": pending_state.get("started_at", int(time.time())),
+            "files": 0,
+            "bytes": 0,
+        }
+        lock = threading.Lock()
+        last_update = [time.monotonic()]
+
+        def progress(zipinfo):
+            with lock:
+                state["files"] += 1
+                state["bytes"] += zipinfo.file_size
+                if time.monotonic() - last_update[0] > PROGRESS_UPDATE_INTERVAL:
+                    last_update[0] = time.monotonic()
+                    self.update_processing_state(state)
+
+        try:
+            # The package is downloaded to disk, and not in memory, as it may be large
+            with tempfile.NamedTemporaryFile(suffix=".zip") as package_file:
+                download_file(self.storage, package_path, package_file)
+                package_file.seek(0)
+                with zipfile.ZipFile(package_file, "r") as scorm_zipfile:
+                    zipinfos = [
+                        zipinfo for zipinfo in scorm_zipfile.infolist() if not is_dir(zipinfo)
+                    ]
+                state["total_files"] = len(zipinfos)
+                state["total_bytes"] = sum(zipinfo.file_size for zipinfo in zipinfos)
+                self.update_processing_state(state)
+                package_file.seek(0)
+                fields = self.prepare_package(package_file, package_meta, progress)
+        except ScormError as e:
+            state["status"] = "error"
+            state["errors"].append(e.args[0])
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to process SCORM package %s", package_path)
+            state["status"] = "error"
+            state["errors"].append(_("Unexpected error while processing the package"))
+        else:
+            state["status"] = "success"
+        finally:
+            self.storage.delete(package_path)
+
+        if state["status"] == "success":
+            current_state = self.get_processing_state()
+            if current_state is not None and current_state["id"] != job_id:
+                # Another package was uploaded in the meantime
+                self.discard_package(fields["package_meta"])
+                return
+            try:
+                self.save_processed_package(fields)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Failed to apply SCORM package %s", package_path)
+                state["status"] = "error"
+                state["errors"].append(_("Unexpected error while applying the package"))
+            else:
+                state["status"] = "complete"
+        self.update_processing_state(state)
+
+    def save_processed_package(self, fields):
+        """
+        Switch the block to a package that was processed in the background, and save it.
+        In Open edX, the block is updated in the modulestore, since no studio request
+        will do it. The block is loaded again right before it is updated, such that only
+        its package fields are modified: other fields might have been edited since
+        processing started.
+        """
+        if modulestore is None:
+            self.apply_package_fields(fields)
+            self.save()
+            return
+        store = modulestore()
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            block = store.get_item(self.scope_ids.usage_id)
+            block.apply_package_fields(fields)
+            store.update_item(block, ModuleStoreEnum.UserID.mgmt_command)
+
+    @XBlock.json_handler
+    def package_processing_status(self, _data, _suffix):
+        """
+        Report the progress of background package processing. Jobs that are still
+        pending or processing after the PACKAGE_PROCESSING_TIMEOUT, for instance because
+        their worker was stopped, are reported as "stalled".
+        """
+        state = self.get_processing_state()
+        if state is None:
+            return {"status": "none", "errors": []}
+        timeout = self.xblock_settings.get(
+            "PACKAGE_PROCESSING_TIMEOUT", DEFAULT_PACKAGE_PROCESSING_TIMEOUT
+        )
+        if (
+            state["status"] in ["pending", "processing"]
+            and time.time() - state.get("started_at", 0) > timeout
+        ):
+            state = dict(
+                state,
+                status="stalled",
+                errors=[_("Package processing did not complete, please upload it again")],
+            )
+        return state
+
+    @property
+    def processing_state_cache_key(self):
+        return f"openedxscorm.package_processing.{self.hashed_usage_id}"
+
+    def get_processing_state(self):
+        return cache.get(self.processing_state_cache_key)
+
+    def set_processing_state(self, state):
+        cache.set(self.processing_state_cache_key, state, self.cache_timeout)
+
+    def update_processing_state(self, state):
+        """
+        Update the processing state, unless another package was uploaded in the meantime.
+        """
+        current_state = self.get_processing_state()
+        if current_state is not None and current_state["id"] != state["id"]:
+            return
+        self.set_processing_state(state)
+
     @XBlock.handler
     def popup_window(self, request, _suffix):
         """
@@ -315,7 +937,9 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
                 "index_page_url": self.index_page_url,
                 "width": self.width or 800,
                 "height": self.height or 800,
-                "navigation_menu": self.navigation_menu,
+                "navigation_menu": (
+                    self.get_navigation_menu() if self.enable_navigation_menu else ""
+                ),
                 "navigation_menu_width": self.navigation_menu_width,
                 "enable_navigation_menu": self.enable_navigation_menu,
                 "enable_fullscreen_button": self.enable_fullscreen_button,
@@ -323,12 +947,33 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         )
         return Response(body=rendered)
 
-    def clean_storage(self):
-        if self.path_exists(self.extract_folder_base_path):
-            logger.info(
-                'Removing previously unzipped "%s"', self.extract_folder_base_path
-            )
-            self.recursive_delete(self.extract_folder_base_path)
+    def clean_storage(self, keep_sha1=None):
+        """
+        Remove previously extracted packages. The package with the `keep_sha1` sha1, if
+        any, is not removed.
+        """
+        extract_folder_base_path = self.extract_folder_base_path
+        if not self.path_exists(extract_folder_base_path):
+            return
+        logger.info('Removing previously unzipped "%s"', extract_folder_base_path)
+        if keep_sha1 is None:
+            self.recursive_delete(extract_folder_base_path)
+            return
+        kept_paths = [
+            os.path.join(extract_folder_base_path, keep_sha1),
+            os.path.join(extract_folder_base_path, f"{keep_sha1}.json"),
+        ]
+        delete_files(
+            self.storage,
+            [
+                path
+                for path in list_files(self.storage, extract_folder_base_path)
+                if not any(
+                    path == kept_path or path.startswith(kept_path + "/")
+                    for kept_path in kept_paths
+                )
+            ],
+        )
 
     def recursive_delete(self, root):
         """
@@ -336,30 +981,59 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         Unfortunately, this will not delete empty folders, as the default FileSystemStorage
         implementation does not allow it.
         """
-        directories, files = self.storage.listdir(root)
-        for directory in directories:
-            self.recursive_delete(os.path.join(root, directory))
-        for f in files:
-            self.storage.delete(os.path.join(root, f))
+        delete_files(self.storage, list_files(self.storage, root))
+
+    def extract_package(self, package_file, progress=None, previous_asset_index=None):
+        """
+        Extract the package to the storage. If defined, `progress` is called with the
+        zipinfo of each member once it is extracted. Files that are unchanged since the
+        package of `previous_asset_index`, if any, are copied from this package instead
+        of being extracted. Return the parsed manifest of the package, as returned by
+        `parse_manifest`.
+        """
+        if self.package_meta.get("content_addressed"):
+            # The reference is added first, such that the shared package is not removed
+            # while we extract it.
+            self.add_package_reference(self.package_meta["sha1"])
+            # The storage is checked directly, as indexes that are cached by other
+            # processes might have been removed
+            if self.storage.exists(self.asset_index_path):
+                logger.info(
+                    "Package %s was already extracted, skipping extraction",
+                    self.package_meta["sha1"],
+                )
+                with zipfile.ZipFile(package_file, "r") as scorm_zipfile:
+                    return self.read_package_manifest(scorm_zipfile)[1]
+            try:
+                return self.extract_package_files(
+                    package_file, progress, previous_asset_index
+                )
+            except Exception:
+                self.release_shared_package(self.package_meta["sha1"])
+                raise
+        return self.extract_package_files(package_file, progress, previous_asset_index)
 
-    def extract_package(self, package_file):
+    def get_reusable_asset_index(self):
+        """
+        Return the asset index of the current package, such that the files that did not
+        change can be reused when a new package is uploaded. Return None if incremental
+        uploads are disabled or if the current package is not indexed.
+        """
+        if not self.xblock_settings.get("INCREMENTAL_UPLOADS", True):
+            return None
+        if not self.package_meta.get("sha1"):
+            return None
+        return self.get_asset_index()
+
+    def extract_package_files(self, package_file, progress=None, previous_asset_index=None):
         with zipfile.ZipFile(package_file, "r") as scorm_zipfile:
             zipinfos = scorm_zipfile.infolist()
-            root_path = None
-            root_depth = -1
-            # Find root folder which contains imsmanifest.xml
-            for zipinfo in zipinfos:
-                if os.path.basename(zipinfo.filename) == "imsmanifest.xml":
-                    depth = len(os.path.split(zipinfo.filename))
-                    if depth < root_depth or root_depth < 0:
-                        root_path = os.path.dirname(zipinfo.filename)
-                        root_depth = depth
-
-            if root_path is None:
-                raise ScormError(
-                    "Could not find 'imsmanifest.xml' file in the scorm package"
-                )
+            # The manifest is parsed before anything is extracted, such that invalid
+            # packages are rejected early.
+            root_path, manifest = self.read_package_manifest(scorm_zipfile)
 
+            extract_folder_path = self.extract_folder_path
+            members = []
             for zipinfo in zipinfos:
                 # Extract only files that are below the root
                 if zipinfo.filename.startswith(root_path):
@@ -370,14 +1044,364 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
                     # TODO: remove backported 'is_dir' method once upgraded to 
                     # python 3.12.3 or greater. 
                     if not is_dir(zipinfo):
-                        dest_path = os.path.join(
-                            self.extract_folder_path,
-                            os.path.relpath(zipinfo.filename, root_path),
-                        )
-                        self.storage.save(
-                            dest_path,
-                            ContentFile(scorm_zipfile.read(zipinfo.filename)),
+                        relative_path = os.path.relpath(zipinfo.filename, root_path)
+                        members.append((zipinfo, relative_path))
+
+            self.check_package_size([zipinfo for zipinfo, _relative_path in members])
+            previous_asset_index = previous_asset_index or {}
+            saved_paths = []
+            try:
+                entries = self.extract_members(
+                    scorm_zipfile,
+                    [
+                        (
+                            zipinfo,
+                            os.path.join(extract_folder_path, relative_path),
+                            get_unchanged_entry(
+                                previous_asset_index.get(
+                                    relative_path.replace(OS_PATH_ALT_SEP, "/")
+                                ),
+                                zipinfo,
+                            ),
                         )
+                        for zipinfo, relative_path in members
+                    ],
+                    saved_paths,
+                    progress,
+                )
+            except Exception:
+                logger.error(
+                    "Failed to extract package, removing %d uploaded files", len(saved_paths)
+                )
+                delete_files(self.storage, saved_paths)
+                raise
+            asset_index = {
+                relative_path.replace(OS_PATH_ALT_SEP, "/"): entry
+                for (_zipinfo, relative_path), entry in zip(members, entries)
+            }
+            self.save_asset_index(asset_index)
+        return manifest
+
+    @staticmethod
+    def read_package_manifest(scorm_zipfile):
+        """
+        Find the root folder of the package, which contains imsmanifest.xml, and parse
+        the manifest straight from the archive. Return the root folder and the parsed
+        manifest.
+        """
+        root_path = None
+        manifest_zipinfo = None
+        root_depth = -1
+        for zipinfo in scorm_zipfile.infolist():
+            if os.path.basename(zipinfo.filename) == "imsmanifest.xml":
+                depth = len(os.path.split(zipinfo.filename))
+                if depth < root_depth or root_depth < 0:
+                    root_path = os.path.dirname(zipinfo.filename)
+                    manifest_zipinfo = zipinfo
+                    root_depth = depth
+
+        if root_path is None:
+            raise ScormError(
+                "Could not find 'imsmanifest.xml' file in the scorm package"
+            )
+        with scorm_zipfile.open(manifest_zipinfo) as imsmanifest_file:
+            return root_path, parse_manifest(imsmanifest_file)
+
+    def extract_members(self, scorm_zipfile, members, saved_paths, progress=None):
+        """
+        Upload the (zipinfo, dest_path, previous_entry) members of the package to the
+        storage and return their asset index entries, in the same order. Members with a
+        previous asset index entry are unchanged, and they are copied from the previous
+        package instead of being extracted. Members are uploaded in parallel by a pool of
+        EXTRACT_CONCURRENCY threads. If any upload fails, the remaining ones are
+        cancelled and the error of the first failed member, in archive order, is raised.
+        Paths of uploaded files are appended to `saved_paths`, such that they can be
+        removed on failure.
+        """
+
+        def extract(zipinfo, dest_path, previous_entry):
+            if previous_entry is None:
+                entry = self.extract_member(scorm_zipfile, zipinfo, dest_path, saved_paths)
+            else:
+                entry = self.copy_member(previous_entry, dest_path, saved_paths)
+            if progress is not None:
+                progress(zipinfo)
+            return entry
+
+        concurrency = max(parse_int(self.xblock_settings.get("EXTRACT_CONCURRENCY"), 1), 1)
+        if concurrency == 1:
+            return [extract(*member) for member in members]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(extract, *member) for member in members]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                future.cancel()
+        # Leaving the executor waits for running uploads to complete
+        for future in futures:
+            if not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+        return [future.result() for future in futures]
+
+    def extract_member(self, scorm_zipfile, zipinfo, dest_path, saved_paths):
+        """
+        Upload a single member of the package to the storage and return its asset index
+        entry. The member is streamed in chunks, and never fully loaded in memory.
+        """
+        with scorm_zipfile.open(zipinfo) as member:
+            content = File(member)
+            content.size = zipinfo.file_size
+            # The storage may pick a different name than the one we asked for, so we
+            # index the name that was actually saved.
+            entry = {
+                "key": self.storage.save(dest_path, content),
+                "size": zipinfo.file_size,
+                "crc": zipinfo.CRC,
+            }
+        saved_paths.append(entry["key"])
+        encodings = self.save_compressed_variants(
+            dest_path, lambda: scorm_zipfile.open(zipinfo), zipinfo.file_size, saved_paths
+        )
+        if encodings:
+            entry["encodings"] = encodings
+        return entry
+
+    def copy_member(self, previous_entry, dest_path, saved_paths):
+        """
+        Copy an unchanged file, along with its pre-compressed variants, from the previous
+        package and return its asset index entry. Files that are already stored at the
+        right path, for instance when the same package is uploaded again, are kept as-is.
+        """
+        entry = dict(previous_entry)
+        entry["key"] = self.copy_asset(previous_entry["key"], dest_path, saved_paths)
+        if "encodings" in previous_entry:
+            entry["encodings"] = {}
+            for encoding, variant in previous_entry["encodings"].items():
+                extension = ASSET_COMPRESSORS.get(encoding, ("",))[0]
+                entry["encodings"][encoding] = dict(
+                    variant,
+                    key=self.copy_asset(
+                        variant["key"], dest_path + extension, saved_paths
+                    ),
+                )
+        return entry
+
+    def copy_asset(self, source, dest_path, saved_paths):
+        """
+        Copy a single file of the previous package, and return its new storage key.
+        """
+        if source == dest_path:
+            return source
+        key = copy_file(self.storage, source, dest_path)
+        saved_paths.append(key)
+        return key
+
+    def save_compressed_variants(self, path, open_content, size, saved_paths):
+        """
+        Save pre-compressed variants of compressible files next to them, such that they
+        can be served to browsers that support them. Return the asset index entries of
+        these variants, indexed by content encoding.
+        """
+        if not self.xblock_settings.get("PRECOMPRESS_ASSETS", False):
+            return {}
+        if size < self.xblock_settings.get("PRECOMPRESS_MIN_SIZE", 1024):
+            return {}
+        if not is_compressible(path):
+            return {}
+        encodings = {}
+        for encoding, (extension, get_compressor) in ASSET_COMPRESSORS.items():
+            compress, finish = get_compressor()
+            with open_content() as content, tempfile.SpooledTemporaryFile(
+                max_size=ASSET_CHUNK_SIZE * 16
+            ) as compressed:
+                for chunk in iter(lambda: content.read(ASSET_CHUNK_SIZE), b""):
+                    compressed.write(compress(chunk))
+                compressed.write(finish())
+                compressed_size = compressed.tell()
+                if compressed_size < size:
+                    compressed.seek(0)
+                    encodings[encoding] = {
+                        "key": self.storage.save(path + extension, File(compressed)),
+                        "size": compressed_size,
+                    }
+                    saved_paths.append(encodings[encoding]["key"])
+        return encodings
+
+    def check_package_size(self, zipinfos):
+        """
+        Reject packages that would use too much space once decompressed, such as
+        decompression bombs. This is checked before anything is extracted, based on the
+        sizes declared in the archive, which are enforced by zipfile during extraction.
+        """
+        max_uncompressed_size = self.xblock_settings.get("MAX_UNCOMPRESSED_SIZE")
+        uncompressed_size = sum(zipinfo.file_size for zipinfo in zipinfos)
+        if max_uncompressed_size and uncompressed_size > max_uncompressed_size:
+            raise ScormError(
+                f"Invalid package: the uncompressed size of the package ({uncompressed_size}"
+                f" bytes) exceeds the maximum size of {max_uncompressed_size} bytes"
+            )
+        max_compression_ratio = self.xblock_settings.get(
+            "MAX_COMPRESSION_RATIO", DEFAULT_MAX_COMPRESSION_RATIO
+        )
+        if not max_compression_ratio:
+            return
+        for zipinfo in zipinfos:
+            # Small files are highly compressible and cannot do any harm
+            if zipinfo.file_size < MIN_COMPRESSION_RATIO_CHECK_SIZE:
+                continue
+            if zipinfo.file_size > max_compression_ratio * max(zipinfo.compress_size, 1):
+                raise ScormError(
+                    f"Invalid package: the compression ratio of '{zipinfo.filename}'"
+                    f" exceeds the maximum ratio of {max_compression_ratio}"
+                )
+
+    @property
+    def asset_index_path(self):
+        """
+        Path to the index of extracted files. It is stored next to the extracted folder
+        and, like this folder, is keyed by the package sha1.
+        """
+        return f"{self.extract_folder_path}.json"
+
+    @staticmethod
+    def asset_index_cache_key(asset_index_path):
+        """
+        Key of the shared cache entry that records that an asset index does not exist.
+        """
+        path_hash = hashlib.sha1(asset_index_path.encode()).hexdigest()
+        return f"openedxscorm.asset_index.{path_hash}"
+
+    @staticmethod
+    def asset_cache_key(asset_index_path, path):
+        """
+        Key of the shared cache entry of a single asset. The index path includes the
+        package sha1.
+        """
+        path_hash = hashlib.sha1(f"{asset_index_path}\n{path}".encode()).hexdigest()
+        return f"openedxscorm.asset.{path_hash}"
+
+    def save_asset_index(self, asset_index):
+        """
+        Persist the relative path -> storage key index of the extracted package.
+        """
+        asset_index_path = self.asset_index_path
+        data = {"files": asset_index}
+        if self.storage.exists(asset_index_path):
+            self.storage.delete(asset_index_path)
+        self.storage.save(asset_index_path, ContentFile(json.dumps(data).encode()))
+        data["basenames"] = index_basenames(asset_index)
+        cache_asset_index(asset_index_path, data)
+        cache.delete(self.asset_index_cache_key(asset_index_path))
+
+    def get_asset_index(self):
+        """
+        Return the index of extracted files, or None for packages that were extracted
+        before indexes were introduced.
+        """
+        return self.load_asset_index()["files"]
+
+    def load_asset_index(self, extract_folder_path=None):
+        """
+        Return the cached index data, with the index of extracted files in "files" and
+        the map of file names to relative paths in "basenames". Both are None for
+        packages that were extracted before indexes were introduced. The index of the
+        current package is returned, unless `extract_folder_path` is given.
+        """
+        if extract_folder_path is None:
+            asset_index_path = self.asset_index_path
+        else:
+            asset_index_path = f"{extract_folder_path}.json"
+        data = get_cached_asset_index(asset_index_path)
+        if data is not None:
+            return data
+        cache_key = self.asset_index_cache_key(asset_index_path)
+        if not cache.get(cache_key) and self.storage.exists(asset_index_path):
+            with self.storage.open(asset_index_path) as index_file:
+                data = json.load(index_file)
+            data["basenames"] = index_basenames(data["files"])
+            cache_asset_index(asset_index_path, data)
+            return data
+        # Cache missing indexes as well, such that we don't probe the storage on every
+        # request.
+        cache.set(cache_key, True, self.cache_timeout)
+        return {"files": None, "basenames": None}
+
+    @property
+    def cache_timeout(self):
+        """
+        Duration (in seconds) during which storage lookups are cached.
+        """
+        return self.xblock_settings.get("CACHE_TIMEOUT", 24 * 60 * 60)
+
+    def cached_storage_lookup(self, name, lookup):
+        """
+        Return the result of a storage lookup. Results are cached per block and package
+        version, both in this instance and in the Django cache, such that they are shared
+        between workers. `name` must be one of STORAGE_LOOKUPS.
+        """
+        if getattr(self, "_storage_lookups", None) is None:
+            self._storage_lookups = {}
+        cache_key = self.storage_lookup_cache_key(name)
+        if cache_key not in self._storage_lookups:
+            value = cache.get(cache_key)
+            if value is None:
+                value = lookup()
+                cache.set(cache_key, value, self.cache_timeout)
+            self._storage_lookups[cache_key] = value
+        return self._storage_lookups[cache_key]
+
+    def invalidate_storage_lookups(self):
+        """
+        Clear the cached storage lookups of the current package version. This must be
+        called whenever the storage folders of this block are modified.
+        """
+        cache.delete_many([self.storage_lookup_cache_key(name) for name in STORAGE_LOOKUPS])
+        self._storage_lookups = {}
+
+    def storage_lookup_cache_key(self, name):
+        return "openedxscorm.{}.{}.{}".format(
+            name, self.hashed_usage_id, self.package_meta.get("sha1", "")
+        )
+
+    def find_asset(self, suffix, extract_folder_path=None):
+        """
+        Return the index entry of the asset that corresponds to the given path, relative
+        to the package root. This entry contains the storage "key" of the asset and its
+        "size", which is None when unknown. Return None if the asset cannot be found.
+        Assets are searched in the current package, unless the `extract_folder_path` of
+        a retired package is given.
+        """
+        if extract_folder_path is None:
+            asset_index_path = self.asset_index_path
+        else:
+            asset_index_path = f"{extract_folder_path}.json"
+        path = self.clean_path(suffix).replace(OS_PATH_ALT_SEP, "/")
+        # Assets are cached one by one, such that requests do not load the whole index
+        cache_key = self.asset_cache_key(asset_index_path, path)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached["entry"]
+
+        data = self.load_asset_index(extract_folder_path)
+        asset_index = data["files"]
+        if asset_index is None and extract_folder_path is not None:
+            # Retired legacy package: search for the file in its folder
+            file_path = self.get_file_path(os.path.basename(path), extract_folder_path)
+            return None if file_path is None else {"key": file_path, "size": None}
+        if asset_index is None:
+            # Legacy package: search for the file in the storage
+            try:
+                file_path = self.find_file_path(os.path.basename(suffix))
+            except ScormError:
+                return None
+            return {"key": file_path, "size": None}
+        if path in asset_index:
+            entry = asset_index[path]
+        else:
+            # Fallback to the previous behaviour, which was to match files by name only
+            relative_path = data["basenames"].get(os.path.basename(path))
+            entry = None if relative_path is None else asset_index[relative_path]
+        cache.set(cache_key, {"entry": entry}, self.cache_timeout)
+        return entry
 
     @property
     def index_page_url(self):
@@ -386,18 +1410,25 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         
         # Serve assets by proxying them through the LMS by default
         if self.xblock_settings.get("PROXY_ASSETS_LMS", True):
-            return f"{self.proxy_base_url}/{self.index_page_path}"
+            return f"{self.assets_base_url}/{self.index_page_path}"
         
-        folder = self.extract_folder_path
+        folder = self.cached_storage_lookup("index_page_folder", self.find_index_page_folder)
+        return self.storage.url(os.path.join(folder, self.index_page_path))
+
+    def find_index_page_folder(self):
+        """
+        Return the storage folder that contains the index page of the package.
+        """
         if self.storage.exists(
             os.path.join(self.extract_folder_base_path, self.clean_path(self.index_page_path))
         ):
             # For backward-compatibility, we must handle the case when the xblock data
             # is stored in the base folder.
-            folder = self.extract_folder_base_path
-            logger.warning("Serving SCORM content from old-style path: %s", folder)
-
-        return self.storage.url(os.path.join(folder, self.index_page_path))
+            logger.warning(
+                "Serving SCORM content from old-style path: %s", self.extract_folder_base_path
+            )
+            return self.extract_folder_base_path
+        return self.extract_folder_path
 
     @property
     def proxy_base_url(self):
@@ -405,14 +1436,124 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
                 self, "assets_proxy"
             ).rstrip("?/")
 
+    @property
+    def assets_base_url(self):
+        """
+        Base url of proxied assets. It includes the package sha1, such that proxied assets
+        can be cached by browsers.
+        """
+        return f"{self.proxy_base_url}/{self.package_meta['sha1']}"
+
+    @property
+    def package_last_modified(self):
+        """
+        Date at which the current package was uploaded, or None if it is unknown.
+        """
+        try:
+            return datetime.datetime.strptime(
+                self.package_meta["last_updated"], DateTime.DATETIME_FORMAT
+            ).replace(tzinfo=datetime.timezone.utc)
+        except (KeyError, TypeError, ValueError):
+            return None
+
     @property
     def extract_folder_path(self):
         """
         This path needs to depend on the content of the scorm package. Otherwise,
         served media files might become stale when the package is update.
         """
+        if self.package_meta.get("content_addressed"):
+            return self.shared_package_path(self.package_meta["sha1"])
         return os.path.join(self.extract_folder_base_path, self.package_meta["sha1"])
 
+    def shared_package_path(self, sha1):
+        """
+        With content-addressed storage, packages are extracted once in a folder that is
+        shared by all the blocks that use them. Blocks hold references to these shared
+        packages, and packages are removed when they are no longer referenced.
+        """
+        return os.path.join(self.scorm_location(), "packages", sha1)
+
+    def add_package_reference(self, sha1):
+        """
+        Record that this block uses a shared package. References are stored in the
+        database, and they are cached such that they are only written once. This
+        happens when a package is uploaded, and when a block is duplicated, pasted or
+        imported.
+        """
+        cache_key = self.package_reference_cache_key(sha1)
+        if cache.get(cache_key):
+            return
+        # The model is imported lazily because the django app of this package is only
+        # installed when it is required.
+        from .models import SharedPackageReference  # pylint: disable=import-outside-toplevel
+
+        with transaction.atomic():
+            lock_shared_package(sha1)
+            SharedPackageReference.objects.get_or_create(
+                sha1=sha1, usage_key=str(self.scope_ids.usage_id)
+            )
+        cache.set(cache_key, True, self.cache_timeout)
+
+    def release_shared_package(self, sha1):
+        """
+        Remove the reference of this block to a shared package, and remove the package
+        if it is no longer used.
+        """
+        from .models import SharedPackageReference  # pylint: disable=import-outside-toplevel
+
+        cache.delete(self.package_reference_cache_key(sha1))
+        with transaction.atomic():
+            # References cannot be added until the package is removed
+            lock_shared_package(sha1)
+            SharedPackageReference.objects.filter(
+                sha1=sha1, usage_key=str(self.scope_ids.usage_id)
+            ).delete()
+            if SharedPackageReference.objects.filter(sha1=sha1).exists():
+                return
+            shared_package_path = self.shared_package_path(sha1)
+            logger.info('Removing unused shared package "%s"', shared_package_path)
+            self.remove_package(shared_package_path)
+
+    def package_reference_cache_key(self, sha1):
+        usage_id_hash = hashlib.sha1(str(self.scope_ids.usage_id).encode()).hexdigest()
+        return f"openedxscorm.package_reference.{sha1}.{usage_id_hash}"
+
+    def studio_post_duplicate(self, store, source_item):
+        """
+        Duplicated blocks reference the shared package of the original block.
+        """
+        if self.package_meta.get("content_addressed"):
+            self.add_package_reference(self.package_meta["sha1"])
+        return False
+
+    def studio_post_paste(self, store, source_node):
+        """
+        Pasted blocks reference the shared package of the copied block.
+        """
+        return self.studio_post_duplicate(store, source_node)
+
+    @classmethod
+    def parse_xml(cls, node, runtime, keys, *args, **kwargs):
+        """
+        Imported blocks reference the shared package that they use.
+        """
+        block = super().parse_xml(node, runtime, keys, *args, **kwargs)
+        if block.package_meta.get("content_addressed"):
+            block.add_package_reference(block.package_meta["sha1"])
+        return block
+
+    def remove_package(self, extract_folder_path):
+        """
+        Remove an extracted package and its asset index from the storage.
+        """
+        asset_index_path = f"{extract_folder_path}.json"
+        if self.storage.exists(asset_index_path):
+            self.storage.delete(asset_index_path)
+        with ASSET_INDEX_CACHE_LOCK:
+            ASSET_INDEX_CACHE.pop(asset_index_path, None)
+        self.recursive_delete(extract_folder_path)
+
     def clean_path(self, path):
         """
         Removes query string from a path
@@ -435,14 +1576,36 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         Path to the folder where packages will be extracted.
         Compute hash of the unique block usage_id and use that as our directory name.
         """
-        # For backwards compatibility, we return the old path if the directory exists
-        if self.path_exists(self.extract_old_folder_base_path):
-            return self.extract_old_folder_base_path
+        return self.cached_storage_lookup(
+            "extract_folder_base_path", self.find_extract_folder_base_path
+        )
+
+    def find_extract_folder_base_path(self):
+        """
+        Uncached version of `extract_folder_base_path`.
+        """
+        # For backwards compatibility, we return the old path if the package was
+        # extracted there. Packages always have an imsmanifest.xml file at their root,
+        # which we use as a marker, because checking for its existence is much cheaper
+        # than listing the folder.
+        old_folder_base_path = self.extract_old_folder_base_path
+        markers = [os.path.join(old_folder_base_path, "imsmanifest.xml")]
+        if self.package_meta.get("sha1"):
+            markers.append(
+                os.path.join(
+                    old_folder_base_path, self.package_meta["sha1"], "imsmanifest.xml"
+                )
+            )
+        if any(self.storage.exists(marker) for marker in markers):
+            return old_folder_base_path
+        return os.path.join(self.scorm_location(), self.hashed_usage_id)
+
+    @property
+    def hashed_usage_id(self):
         sha1 = hashlib.sha1()
         sha1.update(str(self.scope_ids.usage_id).encode())
-        hashed_usage_id = sha1.hexdigest()
-        return os.path.join(self.scorm_location(), hashed_usage_id)
-    
+        return sha1.hexdigest()
+
     @property
     def extract_old_folder_base_path(self):
         """
@@ -466,23 +1629,103 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         name = data.get("name")
         if name in ["cmi.core.lesson_mode", "cmi.mode"]:
             return {"value": self.get_mode(data)}
-        if name in ["cmi.core.lesson_status", "cmi.completion_status"]:
-            return {"value": self.lesson_status}
-        if name == "cmi.success_status":
-            return {"value": self.success_status}
-        if name in ["cmi.core.score.raw", "cmi.score.raw"]:
-            return {"value": self.lesson_score * 100}
-        if name == "cmi.score.scaled":
-            return {"value": self.lesson_score}
-        if name in ["cmi.core.student_id", "cmi.learner_id"]:
-            return {"value": self.get_current_user_attr("edx-platform.user_id")}
-        if name in ["cmi.core.student_name", "cmi.learner_name"]:
-            return {"value": self.get_current_user_attr("edx-platform.username")}
-        return {"value": self.scorm_data.get(name, "")}
+        authoritative_values = self.get_authoritative_values()
+        if name in authoritative_values:
+            return {"value": authoritative_values[name]}
+        learner_values = self.get_learner_values()
+        if name in learner_values:
+            return {"value": learner_values[name]}
+        return {"value": self.scorm_data_backend.get(name, "")}
+
+    def get_authoritative_values(self):
+        """
+        Return the values of the CMI elements that are computed by the xblock, and not
+        simply stored in scorm_data. These values are sent to the client, such that
+        it does not have to fetch them from the `scorm_get_value` handler.
+        """
+        return {
+            "cmi.core.lesson_status": self.lesson_status,
+            "cmi.completion_status": self.lesson_status,
+            "cmi.success_status": self.success_status,
+            "cmi.core.score.raw": self.lesson_score * 100,
+            "cmi.score.raw": self.lesson_score * 100,
+            "cmi.score.scaled": self.lesson_score,
+        }
+
+    @XBlock.handler
+    def scorm_get_values(self, request, _suffix):
+        """
+        Return the values of the CMI elements of the current learner that match the
+        "prefix" parameter. This is how the client loads the values that were not
+        embedded in the student view. Responses are compressed, and the browser
+        revalidates them with their etag.
+        """
+        prefix = request.params.get("prefix", "")
+        body = json.dumps(
+            self.scorm_data_backend.get_many([prefix]), sort_keys=True
+        ).encode()
+        etag = hashlib.sha1(body).hexdigest()
+        encoding = None
+        if len(body) >= MIN_COMPRESSED_RESPONSE_SIZE:
+            encoding = select_content_encoding(
+                request.headers.get("Accept-Encoding"), ASSET_COMPRESSORS
+            )
+        if encoding:
+            etag = f"{etag}-{encoding}"
+        if is_not_modified(request, [etag], None):
+            response = Response(status=304)
+        else:
+            if encoding:
+                compress, finish = ASSET_COMPRESSORS[encoding][1]()
+                body = compress(body) + finish()
+            response = Response(body=body, content_type="application/json", charset="utf8")
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.headers["ETag"] = f'"{etag}"'
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
 
     @XBlock.json_handler
-    def scorm_set_values(self, data_list, _suffix):
-        return [self.set_value(data) for data in data_list]
+    def scorm_set_values(self, data, _suffix):
+        """
+        Set a batch of values and return the list of their results. The result of the
+        last value also includes the up-to-date authoritative values.
+
+        Batches include the id of the client session and their sequence number in this
+        session: values that were already written by a more recent batch of the same
+        session are not set, and their result is "stale". Batches that are plain lists
+        of values are accepted from older clients.
+        """
+        if isinstance(data, list):
+            data = {"values": data}
+        data_list = data.get("values", [])
+        session = data.get("session") or ""
+        sequence = parse_int(data.get("sequence"), None)
+        if not isinstance(session, str) or len(session) > MAX_SESSION_LENGTH:
+            return JsonHandlerError(400, "Invalid 'session'").get_response()
+        if sequence is not None and not 0 <= sequence <= MAX_SEQUENCE:
+            return JsonHandlerError(400, "Invalid 'sequence'").get_response()
+        # Grade and completion events are published once per batch, based on the final
+        # state, even if a value is invalid.
+        events = {}
+        try:
+            with self.scorm_data_backend.write(
+                session=session,
+                sequence=sequence,
+                names=[value.get("name") for value in data_list],
+            ) as stale:
+                results = [
+                    {"result": "stale"}
+                    if value.get("name") in stale
+                    else self.apply_value(value, events)
+                    for value in data_list
+                ]
+        finally:
+            self.publish_events(events)
+        if results:
+            results[-1]["authoritative_values"] = self.get_authoritative_values()
+        return results
 
     @XBlock.json_handler
     def scorm_set_value(self, data, _suffix):
@@ -492,6 +1735,19 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
             return JsonHandlerError(400, e.args[0]).get_response()
 
     def set_value(self, data):
+        events = {}
+        try:
+            with self.scorm_data_backend.write(names=[data.get("name")]):
+                return self.apply_value(data, events)
+        finally:
+            self.publish_events(events)
+
+    def apply_value(self, data, events):
+        """
+        Set a single value and return its result. The grade and completion events that
+        should be published are recorded in the `events` dict, and published later by
+        `publish_events`.
+        """
         name = data.get("name")
         value = data.get("value")
         completion_percent = None
@@ -501,7 +1757,7 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
 
         is_completed = self.lesson_status == "completed"
 
-        self.scorm_data[name] = value
+        self.scorm_data_backend.set(name, value)
         if name == "cmi.core.lesson_status":
             lesson_status = value
             if lesson_status in ["passed", "failed"]:
@@ -523,27 +1779,68 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
 
         context = {"result": "success"}
         if lesson_score is not None:
-            self.lesson_score = lesson_score
+            self.update_field("lesson_score", lesson_score)
             context.update({"grade": self.get_grade()})
-        if completion_percent is not None:
-            self.emit_completion(completion_percent)
+        if completion_percent is not None and self.should_publish_progress(
+            completion_percent, events.get("completion", self.last_completion)
+        ):
+            events["completion"] = completion_percent
         if completion_status:
-            self.lesson_status = completion_status
+            self.update_field("lesson_status", completion_status)
             context.update({"completion_status": completion_status})
         if success_status:
-            self.success_status = success_status
+            self.update_field("success_status", success_status)
         if completion_status == "completed":
-            self.emit_completion(1)
+            events["completion"] = 1
         if (
             success_status
             or completion_status == "completed"
             or (is_completed and lesson_score)
         ):
             if self.has_score:
-                self.publish_grade()
+                events["grade"] = True
 
         return context
 
+    def update_field(self, name, value):
+        """
+        Set the value of a field only if it changed: fields that are set are saved by
+        the runtime, even when their value is unchanged.
+        """
+        if getattr(self, name) != value:
+            setattr(self, name, value)
+
+    def should_publish_progress(self, progress, last_completion):
+        """
+        Progress measures are throttled: they are published as completion events only
+        if they changed by at least PROGRESS_COMPLETION_MIN_DELTA since the last
+        completion, or if they crossed one of the PROGRESS_COMPLETION_THRESHOLDS, or if
+        the content is complete.
+        """
+        if last_completion is None or progress >= 1:
+            return True
+        min_delta = self.xblock_settings.get(
+            "PROGRESS_COMPLETION_MIN_DELTA", DEFAULT_PROGRESS_COMPLETION_MIN_DELTA
+        )
+        if abs(progress - last_completion) >= min_delta:
+            return True
+        return any(
+            (last_completion < threshold) != (progress < threshold)
+            for threshold in self.xblock_settings.get("PROGRESS_COMPLETION_THRESHOLDS", [])
+        )
+
+    def publish_events(self, events):
+        """
+        Publish the completion and grade events that were recorded by `apply_value`.
+        Only the last completion is published, and the grade is computed from the
+        current state.
+        """
+        if "completion" in events:
+            self.emit_completion(events["completion"])
+            self.update_field("last_completion", events["completion"])
+        if events.get("grade"):
+            self.publish_grade()
+
     def publish_grade(self):
         self.runtime.publish(
             self,
@@ -575,67 +1872,84 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         return self.weight if self.has_score else None
 
     def update_package_meta(self, package_file):
-        self.package_meta["sha1"] = self.get_sha1(package_file)
-        self.package_meta["name"] = package_file.name
-        self.package_meta["last_updated"] = timezone.now().strftime(
-            DateTime.DATETIME_FORMAT
-        )
-        self.package_meta["size"] = package_file.seek(0, 2)
+        self.package_meta.update(self.get_package_meta(package_file))
+
+    def get_package_meta(self, package_file):
+        package_meta = {
+            "sha1": self.get_sha1(package_file),
+            "name": package_file.name,
+            "last_updated": timezone.now().strftime(DateTime.DATETIME_FORMAT),
+            "size": package_file.seek(0, 2),
+            # This is recorded per package, such that changing the setting does not
+            # affect packages that were already extracted.
+            "content_addressed": bool(
+                self.xblock_settings.get("CONTENT_ADDRESSED_STORAGE", False)
+            ),
+        }
         package_file.seek(0)
+        return package_meta
 
-    def update_package_fields(self):
+    def update_package_fields(self, manifest=None):
         """
-        Update version and index page path fields.
+        Update manifest, version and index page path fields. The `manifest` model is
+        parsed from the package during extraction; if it is not provided, it is loaded
+        from the storage.
         """
-        imsmanifest_path = self.find_file_path("imsmanifest.xml")
-        imsmanifest_file = self.storage.open(imsmanifest_path)
-        tree = ET.parse(imsmanifest_file)
-        imsmanifest_file.seek(0)
-        namespace = ""
-        for _, node in ET.iterparse(imsmanifest_file, events=["start-ns"]):
-            if node[0] == "":
-                namespace = node[1]
-                break
-        root = tree.getroot()
-
-        prefix = "{" + namespace + "}" if namespace else ""
-        resource = root.find(
-            f"{prefix}resources/{prefix}resource[@href]"
-        )
-        schemaversion = root.find(
-            f"{prefix}metadata/{prefix}schemaversion"
-        )
-
-        self.extract_navigation_titles(root, prefix)
-
-        if resource is not None:
-            self.index_page_path = resource.get("href")
+        if manifest is None:
+            imsmanifest_path = self.find_file_path("imsmanifest.xml")
+            with self.storage.open(imsmanifest_path) as imsmanifest_file:
+                manifest = parse_manifest(imsmanifest_file)
+        self.package_meta = dict(self.package_meta, manifest=manifest)
+        # The navigation menu is rendered on demand from the manifest model
+        self.navigation_menu = ""
+
+        index_page_path = manifest["index_href"]
+        if index_page_path is not None:
+            self.index_page_path = index_page_path
         else:
             self.index_page_path = self.find_relative_file_path("index.html")
+        schemaversion = manifest["schemaversion"]
         if (schemaversion is not None) and (
-            re.match("^1.2$", schemaversion.text) is None
+            re.match("^1.2$", schemaversion) is None
         ):
             self.scorm_version = "SCORM_2004"
         else:
             self.scorm_version = "SCORM_12"
 
-    def extract_navigation_titles(self, root, prefix):
-        """Extracts all the titles of items to build a navigation menu from the imsmanifest.xml file
+    def get_navigation_menu(self):
+        """
+        Return the HTML navigation menu of the package. The menu is rendered from the
+        manifest model, and cached per package and base url of the proxied assets.
+        """
+        manifest = self.package_meta.get("manifest")
+        if manifest is None:
+            # The menu of packages that were uploaded by earlier versions of this
+            # xblock was rendered at upload time.
+            return self.navigation_menu
+        assets_base_url = self.assets_base_url
+        cache_key = "openedxscorm.navigation_menu.{}.{}".format(
+            self.package_meta["sha1"],
+            hashlib.sha1(assets_base_url.encode()).hexdigest(),
+        )
+        navigation_menu = cache.get(cache_key)
+        if navigation_menu is None:
+            navigation_menu = self.render_navigation_menu(manifest)
+            cache.set(cache_key, navigation_menu, self.cache_timeout)
+        return navigation_menu
+
+    def render_navigation_menu(self, manifest):
+        """Extracts all the titles of items to build a navigation menu from the manifest model
 
         Args:
-            root (XMLTag): root of the imsmanifest.xml file
-            prefix (string): namespace to match with in the xml file
+            manifest (dict): manifest model, as returned by `parse_manifest`
         """
-        organizations = root.findall(
-            f"{prefix}organizations/{prefix}organization"
-        )
         navigation_menu_titles = []
         # Get data for all organizations
-        for organization in organizations:
+        for organization in manifest["organizations"]:
             navigation_menu_titles.append(
-                self.find_titles_recursively(organization, prefix, root)
+                self.find_titles_recursively(organization, manifest["resources"])
             )
-        self.navigation_menu = self.recursive_unorderedlist(navigation_menu_titles)
+        return self.recursive_unorderedlist(navigation_menu_titles)
 
     def sanitize_input(self, input_str):
         """Removes script tags from string"""
@@ -644,37 +1958,32 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         )
         return sanitized_str
 
-    def find_titles_recursively(self, item, prefix, root):
-        """Recursively iterate through the organization tags and extract the title and resources
+    def find_titles_recursively(self, item, resources):
+        """Recursively iterate through the organization items and extract the title and resources
 
         Args:
-            item (XMLTag): The current node to iterate on
-            prefix (string): namespace to match with in the xml file
-            root (XMLTag): root of the imsmanifest.xml file
+            item (dict): The current item of the manifest model to iterate on
+            resources (dict): resources of the manifest model, indexed by identifier
 
         Returns:
             List: Nested list of all the title tags and their resources
         """
-        children = item.findall(f"{prefix}item")
-        item_title = item.find(f"{prefix}title").text
+        children = item.get("items", [])
         # Sanitizing every title tag to protect against XSS attacks
-        sanitized_title = self.sanitize_input(item_title)
-        item_identifier = item.get("identifierref")
+        sanitized_title = self.sanitize_input(item["title"])
+        resource_href = resources.get(item.get("identifierref"), {}).get("href")
         # If item does not have a resource, we don't need to make it into a link
-        if not item_identifier:
+        if resource_href is None:
             resource_link = "#"
         else:
-            resource = root.find(
-                f"{prefix}resources/{prefix}resource[@identifier='{item_identifier}']"
-            )
             # Attach the storage path with the file path
-            resource_link = f"{self.proxy_base_url}/{resource.get('href')}"
+            resource_link = f"{self.assets_base_url}/{resource_href}"
         if not children:
             return [(sanitized_title, resource_link)]
         child_titles = []
         for child in children:
-            if "isvisible" in child.attrib and child.attrib["isvisible"] == "true":
-                child_titles.extend(self.find_titles_recursively(child, prefix, root))
+            if child.get("isvisible") == "true":
+                child_titles.extend(self.find_titles_recursively(child, resources))
         return [(sanitized_title, resource_link), child_titles]
 
     def recursive_unorderedlist(self, value):
@@ -861,7 +2170,9 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
             )
             raise
         module_state = json.loads(module.state)
-        scorm_data = module_state.get("scorm_data", {})
+        scorm_data = self.get_scorm_data_backend(
+            user_id, module_state.get("scorm_data", {})
+        ).get_all()
         return self.json_response(scorm_data)
 
     @property
@@ -900,6 +2211,41 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
 
         return self._storage
 
+    @property
+    def scorm_data_backend(self):
+        """
+        Return the backend that stores the scorm data of the current learner. This is a
+        cached property.
+        """
+        if not getattr(self, "_scorm_data_backend", None):
+            self._scorm_data_backend = self.get_scorm_data_backend(
+                self.scope_ids.user_id, self.scorm_data
+            )
+        return self._scorm_data_backend
+
+    def get_scorm_data_backend(self, user_id, scorm_data):
+        """
+        Return the backend that stores the scorm data of the given learner, whose
+        `scorm_data` field is also passed as argument. The backend is defined by the
+        SCORM_DATA_BACKEND setting. Large values are compressed, unless the
+        SCORM_DATA_COMPRESSION_MIN_SIZE setting is 0.
+        """
+        backend_func = self.xblock_settings.get(
+            "SCORM_DATA_BACKEND", "openedxscorm.scorm_data.field"
+        )
+        if isinstance(backend_func, string_types):
+            backend_func = import_string(backend_func)
+        return CompressedScormData(
+            backend_func(self, user_id, scorm_data),
+            parse_int(
+                self.xblock_settings.get(
+                    "SCORM_DATA_COMPRESSION_MIN_SIZE",
+                    DEFAULT_SCORM_DATA_COMPRESSION_MIN_SIZE,
+                ),
+                DEFAULT_SCORM_DATA_COMPRESSION_MIN_SIZE,
+            ),
+        )
+
     @property
     def xblock_settings(self):
         """
@@ -911,6 +2257,20 @@ class ScormXBlock(XBlock, CompletableXBlockMixin):
         return settings_service.get_settings_bucket(self)
 
 
+PACKAGE_PROCESSING_POOL = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="openedxscorm"
+)
+
+
+def thread_executor(xblock, job_id, package_meta, package_path):
+    """
+    Process packages in the background, in a pool of threads of the current process.
+    """
+    PACKAGE_PROCESSING_POOL.submit(
+        xblock.process_package, job_id, package_meta, package_path
+    )
+
+
 def parse_int(value, default):
     try:
         return int(value)
@@ -937,6 +2297,321 @@ def parse_validate_positive_float(value, name):
     return parsed
 
 
+def parse_byte_ranges(header, size):
+    """
+    Parse the value of a "Range" header. Return None if the header is missing or invalid,
+    in which case the full content should be served. Otherwise, return the list of
+    satisfiable (start, end) byte ranges, where end is excluded. An empty list means
+    that the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    unit, _, range_set = header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    range_specs = range_set.split(",")
+    if len(range_specs) > MAX_BYTE_RANGES:
+        return None
+    byte_ranges = []
+    for range_spec in range_specs:
+        first, separator, last = range_spec.strip().partition("-")
+        if not separator or not (first or last):
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) + 1 if last else size
+                if start < 0 or (last and end <= start):
+                    return None
+            else:
+                # Suffix range: last N bytes
+                suffix_length = int(last)
+                if suffix_length < 0:
+                    return None
+                start = max(size - suffix_length, 0)
+                end = size if suffix_length > 0 else 0
+        except ValueError:
+            return None
+        end = min(end, size)
+        if start < end:
+            byte_ranges.append((start, end))
+    return byte_ranges
+
+
+def is_not_modified(request, etags, last_modified):
+    """
+    Return True if the client already has the current version of an asset, based on the
+    conditional headers of the request. `etags` are the etags of all the variants of the
+    asset.
+    """
+    if "If-None-Match" in request.headers:
+        # If-Modified-Since must be ignored when If-None-Match is present
+        return any(etag in request.if_none_match for etag in etags)
+    if_modified_since = request.if_modified_since
+    if if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= if_modified_since
+    return False
+
+
+def is_compressible(path):
+    """
+    Return True if the file at this path is worth compressing, based on its mime type.
+    """
+    file_type, _ = mimetypes.guess_type(path)
+    if not file_type:
+        return False
+    return file_type.startswith("text/") or file_type in COMPRESSIBLE_MIME_TYPES
+
+
+def gzip_compressor():
+    """
+    Return the (compress, finish) functions of a streaming gzip compressor.
+    """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress, compressor.flush
+
+
+def brotli_compressor():
+    """
+    Return the (compress, finish) functions of a streaming brotli compressor.
+    """
+    compressor = brotli.Compressor()
+    return compressor.process, compressor.finish
+
+
+def parse_manifest(imsmanifest_file):
+    """
+    Parse an imsmanifest.xml file in a single pass, and return its compact model: a
+    JSON-serializable dict with the "schemaversion" of the package, its "organizations"
+    as trees of items, and its "resources", indexed by identifier, with their "href"
+    and the list of their "files". Optional keys are omitted when they are empty. The
+    "index_href" is the href of the first resource that has one, in document order,
+    including resources with duplicate or missing identifiers.
+    """
+    namespace = None
+    try:
+        events = ET.iterparse(imsmanifest_file, events=["start-ns", "start"])
+        # The root element is the first element to start, and the parser then builds
+        # the rest of the tree.
+        root = None
+        for event, node in events:
+            if event == "start-ns":
+                if node[0] == "" and namespace is None:
+                    namespace = node[1]
+            elif root is None:
+                root = node
+    except ET.ParseError as e:
+        raise ScormError(f"Invalid package: could not parse 'imsmanifest.xml': {e}")
+    prefix = "{" + namespace + "}" if namespace else ""
+
+    resources = {}
+    index_href = None
+    for resource in root.iterfind(f"{prefix}resources/{prefix}resource"):
+        model = {}
+        if resource.get("href") is not None:
+            model["href"] = resource.get("href")
+            if index_href is None:
+                index_href = resource.get("href")
+        files = [
+            f.get("href")
+            for f in resource.iterfind(f"{prefix}file")
+            if f.get("href") is not None
+        ]
+        if files:
+            model["files"] = files
+        # In case of duplicate identifiers, the first resource is used
+        resources.setdefault(resource.get("identifier", ""), model)
+    schemaversion = root.find(f"{prefix}metadata/{prefix}schemaversion")
+    return {
+        "schemaversion": (
+            (schemaversion.text or "") if schemaversion is not None else None
+        ),
+        "organizations": [
+            parse_manifest_item(organization, prefix)
+            for organization in root.iterfind(
+                f"{prefix}organizations/{prefix}organization"
+            )
+        ],
+        "resources": resources,
+        "index_href": index_href,
+    }
+
+
+def parse_manifest_item(item, prefix):
+    """
+    Return the model of an organization or item of the manifest, along with its
+    children items.
+    """
+    model = {"title": item.findtext(f"{prefix}title") or ""}
+    for attribute in ["identifierref", "isvisible"]:
+        if item.get(attribute) is not None:
+            model[attribute] = item.get(attribute)
+    children = [parse_manifest_item(child, prefix) for child in item.iterfind(f"{prefix}item")]
+    if children:
+        model["items"] = children
+    return model
+
+
+def lock_shared_package(sha1):
+    """
+    Lock the row of a shared package until the end of the current transaction.
+    """
+    from .models import SharedPackage  # pylint: disable=import-outside-toplevel
+
+    SharedPackage.objects.get_or_create(sha1=sha1)
+    SharedPackage.objects.select_for_update().get(sha1=sha1)
+
+
+def get_cached_asset_index(asset_index_path):
+    with ASSET_INDEX_CACHE_LOCK:
+        data = ASSET_INDEX_CACHE.get(asset_index_path)
+        if data is not None:
+            ASSET_INDEX_CACHE.move_to_end(asset_index_path)
+        return data
+
+
+def cache_asset_index(asset_index_path, data):
+    with ASSET_INDEX_CACHE_LOCK:
+        ASSET_INDEX_CACHE[asset_index_path] = data
+        ASSET_INDEX_CACHE.move_to_end(asset_index_path)
+        while len(ASSET_INDEX_CACHE) > ASSET_INDEX_CACHE_SIZE:
+            ASSET_INDEX_CACHE.popitem(last=False)
+
+
+def index_basenames(asset_index):
+    """
+    Map the file names of an asset index to their relative paths. When several files
+    have the same name, the first relative path in alphabetical order wins.
+    """
+    basenames = {}
+    for relative_path in sorted(asset_index):
+        basenames.setdefault(os.path.basename(relative_path), relative_path)
+    return basenames
+
+
+def get_unchanged_entry(entry, zipinfo):
+    """
+    Return the asset index entry of a previously extracted file if the zip member has the
+    same content, based on its CRC-32 and size. Otherwise, return None.
+    """
+    if entry is None or entry.get("crc") is None:
+        return None
+    if entry["crc"] != zipinfo.CRC or entry["size"] != zipinfo.file_size:
+        return None
+    return entry
+
+
+def copy_file(storage, source, destination):
+    """
+    Copy a file within the storage and return the name of the copy. Storages that
+    implement a `copy` method, such as the S3 storage of this package, copy files
+    without downloading them.
+    """
+    if hasattr(storage, "copy"):
+        return storage.copy(source, destination)
+    with storage.open(source) as content:
+        return storage.save(destination, File(content))
+
+
+def list_files(storage, root):
+    """
+    Recursively list the paths of the files in a directory of the storage.
+    """
+    directories, files = storage.listdir(root)
+    for directory in directories:
+        yield from list_files(storage, os.path.join(root, directory))
+    for f in files:
+        yield os.path.join(root, f)
+
+
+def delete_files(storage, paths, concurrency=DELETE_CONCURRENCY):
+    """
+    Delete files from the storage. Storages that implement a `delete_many` method, such
+    as the S3 storage of this package, delete files in batches. Other storages delete
+    files in parallel, in a pool of threads.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    if hasattr(storage, "delete_many"):
+        storage.delete_many(paths)
+        return
+    if concurrency <= 1 or len(paths) == 1:
+        for path in paths:
+            storage.delete(path)
+        return
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(paths))) as executor:
+        # Consume the results, such that deletion errors are raised
+        list(executor.map(storage.delete, paths))
+
+
+def download_file(storage, path, fileobj):
+    """
+    Copy a stored file to a file object. Storages that implement a `download` method,
+    such as the S3 storage of this package, stream the file: files that are opened by S3
+    storages are loaded entirely in memory. Other files are copied in chunks.
+    """
+    if hasattr(storage, "download"):
+        storage.download(path, fileobj)
+        return
+    with storage.open(path) as stored_file:
+        shutil.copyfileobj(stored_file, fileobj, ASSET_CHUNK_SIZE)
+
+
+def select_content_encoding(accept_encoding, encodings):
+    """
+    Return the content encoding to use, among the available `encodings`, given the value
+    of the "Accept-Encoding" header. Return None if the asset should be sent as-is.
+    """
+    if not accept_encoding or not encodings:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [param.strip() for param in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                quality = parse_float(value, 0)
+        qualities[coding.lower()] = quality
+    # Encodings are selected in our order of preference
+    for encoding in ASSET_COMPRESSORS:
+        if encoding in encodings and qualities.get(encoding, qualities.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def iter_file_parts(storage, path, parts):
+    """
+    Stream the parts of a stored file in chunks of bounded size. Each part is either a
+    (start, end) byte range of the file, where end is excluded, or bytes that are yielded
+    as-is. Storages that implement a `read_range` method, such as the S3 storage of this
+    package, fetch each range separately: files that are opened by S3 storages are
+    downloaded entirely. Other files are opened only when iteration starts.
+    """
+    if hasattr(storage, "read_range"):
+        for part in parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                yield from storage.read_range(path, part[0], part[1], ASSET_CHUNK_SIZE)
+        return
+    with storage.open(path) as stored_file:
+        for part in parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            start, end = part
+            stored_file.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = stored_file.read(min(ASSET_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
 def is_dir(zipinfo):
     """Return True if this archive member is a directory."""
     if zipinfo.filename.endswith('/'):
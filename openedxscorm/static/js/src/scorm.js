@@ -1,11 +1,15 @@
-function SCORM_12_API(GetValue, SetValue) {
+function SCORM_12_API(GetValue, SetValue, Commit, Finish) {
+  Commit = Commit || function () {};
+  Finish = Finish || Commit;
   this.LMSInitialize = function () {
     return "true";
   };
   this.LMSFinish = function () {
+    Finish();
     return "true";
   };
   this.LMSCommit = function () {
+    Commit();
     return "true";
   };
   this.LMSGetLastError = function () {
@@ -21,14 +25,18 @@ function SCORM_12_API(GetValue, SetValue) {
   this.LMSSetValue = SetValue;
 }
 
-function SCORM_2004_API(GetValue, SetValue) {
+function SCORM_2004_API(GetValue, SetValue, Commit, Finish) {
+  Commit = Commit || function () {};
+  Finish = Finish || Commit;
   this.Initialize = function () {
     return "true";
   };
   this.Terminate = function () {
+    Finish();
     return "true";
   };
   this.Commit = function () {
+    Commit();
     return "true";
   };
   this.GetLastError = function () {
@@ -44,10 +52,10 @@ function SCORM_2004_API(GetValue, SetValue) {
   this.SetValue = SetValue;
 }
 
-function initScorm(scormVersion, getValueFunc, setValueFunc) {
+function initScorm(scormVersion, getValueFunc, setValueFunc, commitFunc, finishFunc) {
   if (scormVersion == 'SCORM_12') {
-    API = new SCORM_12_API(getValueFunc, setValueFunc);
+    API = new SCORM_12_API(getValueFunc, setValueFunc, commitFunc, finishFunc);
   } else {
-    API_1484_11 = new SCORM_2004_API(getValueFunc, setValueFunc);
+    API_1484_11 = new SCORM_2004_API(getValueFunc, setValueFunc, commitFunc, finishFunc);
   }
 }
@@ -180,8 +180,8 @@ function ScormXBlock(runtime, element, settings) {
             navigationClick = true;
          });
         
-    // We only make calls to the get_value handler when absolutely required.
-    // These calls are synchronous and they can easily clog the scorm display.
+    // These values are computed by the xblock. They are sent by the server on page load
+    // and after each call to the set_values handler, such that we can answer locally.
     var uncachedValues = [
         "cmi.core.lesson_status",
         "cmi.completion_status",
@@ -191,11 +191,38 @@ function ScormXBlock(runtime, element, settings) {
         "cmi.score.scaled",
         "cmi.mode"
     ];
+    var authoritativeValues = settings.authoritative_values || {};
+    // Same as the get_mode method of the xblock
+    function getMode() {
+        return window.location.href.indexOf("preview") !== -1 ? "review" : "normal";
+    }
+    // We only make calls to the get_value handler when absolutely required.
+    // These calls are synchronous and they can easily clog the scorm display.
     var getValueUrl = runtime.handlerUrl(element, 'scorm_get_value');
-    var GetValue = function (cmi_element) {   
+    var GetValue = function (cmi_element) {
+        if (cmi_element === "cmi.mode" || cmi_element === "cmi.core.lesson_mode") {
+            navigationClick = false;
+            return getMode();
+        }
+        if (cmi_element in pendingValues) {
+            // This value was not sent to the server yet
+            navigationClick = false;
+            return String(pendingValues[cmi_element]);
+        }
+        var runningValue = findRunningValue(cmi_element);
+        if (runningValue !== null) {
+            // This value was sent, but the authoritative values were not updated yet
+            navigationClick = false;
+            return String(runningValue.value);
+        }
+        if (cmi_element in authoritativeValues) {
+            navigationClick = false;
+            return String(authoritativeValues[cmi_element]);
+        }
         // Only make a call if navigation menu was not used
         // Otherwise the synchronous calls are blocked by chromium on page unload
         if (uncachedValues.includes(cmi_element) && !navigationClick){
+            var value = "";
             $.ajax({
                 type: "POST",
                 url: getValueUrl,
@@ -205,77 +232,311 @@ function ScormXBlock(runtime, element, settings) {
                 }),
                 async: false,
                 success: function (response) {
-                    // Set to false to allow for other calls by the SCORM api
-                    navigationClick = false;
-                    return response.value;
+                    value = String(response.value);
                 }
             });
-        } else if (cmi_element in settings.scorm_data) {
+            navigationClick = false;
+            return value;
+        }
+        if (!navigationClick) {
+            loadScormData(cmi_element);
+        }
+        if (cmi_element in settings.scorm_data) {
             navigationClick = false;
             return settings.scorm_data[cmi_element];
         }
         navigationClick = false;
         return "";
     };
+
+    // Only some of the scorm data is embedded in the page. Other values are loaded
+    // when they are first accessed, along with all values that share the same prefix
+    // (e.g: "cmi.interactions").
+    var embeddedScormData = settings.embedded_scorm_data;
+    var loadedPrefixes = {};
+    var getValuesUrl = runtime.handlerUrl(element, 'scorm_get_values');
+    function isEmbedded(cmi_element) {
+        if (!embeddedScormData) {
+            return true;
+        }
+        for (var i = 0; i < embeddedScormData.length; i += 1) {
+            var prefix = embeddedScormData[i];
+            if (cmi_element === prefix || cmi_element.indexOf(prefix + ".") === 0) {
+                return true;
+            }
+        }
+        return false;
+    }
+    function loadScormData(cmi_element) {
+        var prefix = cmi_element.split(".").slice(0, 2).join(".");
+        if (isEmbedded(cmi_element) || loadedPrefixes[prefix]) {
+            return;
+        }
+        // Prefixes are only requested once, even if the request fails, such that
+        // packages are not blocked by a synchronous request on every read.
+        loadedPrefixes[prefix] = true;
+        $.ajax({
+            type: "GET",
+            url: getValuesUrl,
+            data: {
+                'prefix': prefix
+            },
+            async: false,
+            success: function (values) {
+                for (var name in values) {
+                    // Values that were set on this page are more recent
+                    if (!(name in settings.scorm_data)) {
+                        settings.scorm_data[name] = values[name];
+                    }
+                }
+            }
+        });
+    }
     
-    var setValueEvents = [];
-    var processingSetValueEventsQueue = false;
+    // Values are not sent to the server right away. Instead, they are buffered and only
+    // the last value of each element is sent when the buffer is flushed: on commit,
+    // after the flush interval, or when the page is hidden.
+    var pendingValues = {};
+    var hasPendingValues = false;
+    var flushTimeout = null;
+    var flushInterval = settings.set_values_flush_interval || 0;
+    // Batches are numbered in each session, such that the server can reject values
+    // from batches that arrive after a more recent batch. Thus, several batches can be
+    // sent concurrently, when the server supports it.
+    var sessionId = Date.now().toString(36) + Math.random().toString(36).slice(2);
+    var sequence = 0;
+    var runningRequests = 0;
+    var maxRunningRequests = settings.max_set_values_requests || 1;
+    var lastResultSequence = 0;
+    // Sequence number of the last batch that included each element
+    var sentSequences = {};
+    var runningBatches = {};
+    // Whether the last values should be sent once the running batch completes
+    var finishing = false;
     var setValuesUrl = runtime.handlerUrl(element, 'scorm_set_values');
     var SetValue = function (cmi_element, value) {
-        SetValueAsync(cmi_element, value);
+        if (!uncachedValues.includes(cmi_element)) {
+            // Update the local scorm data copy to fetch results faster with get_value
+            settings.scorm_data[cmi_element] = value;
+        }
+        // Re-insert the element, such that values are sent in the order of their last write
+        delete pendingValues[cmi_element];
+        pendingValues[cmi_element] = value;
+        hasPendingValues = true;
+        if (flushTimeout === null) {
+            flushTimeout = setTimeout(onFlushTimeout, flushInterval * 1000);
+        }
         return "true";
     }
-    function SetValueAsync(cmi_element, value) {
-        setValueEvents.push([cmi_element, value]);
-        if (!processingSetValueEventsQueue) {
-            // There is no running queue processor so we start one
-            processSetValueQueueItems();
+    function findRunningValue(cmi_element) {
+        // Values of the most recent batches are looked up first
+        var sequences = Object.keys(runningBatches).map(Number).sort(function (a, b) {
+            return b - a;
+        });
+        for (var i = 0; i < sequences.length; i += 1) {
+            var values = runningBatches[sequences[i]].values;
+            for (var j = values.length - 1; j >= 0; j -= 1) {
+                if (values[j].name === cmi_element) {
+                    return values[j];
+                }
+            }
         }
+        return null;
     }
-    function processSetValueQueueItems() {
-        if (setValueEvents.length === 0) {
-            // Exit if there is no event left in the queue
-            processingSetValueEventsQueue = false;
-            return;
+    function popPendingValues() {
+        var values = [];
+        sequence += 1;
+        for (var cmi_element in pendingValues) {
+            values.push({
+                'name': cmi_element,
+                'value': pendingValues[cmi_element]
+            });
+            sentSequences[cmi_element] = sequence;
         }
-        processingSetValueEventsQueue = true;
-        var data = [];
-        while (setValueEvents.length > 0) {
-            params = setValueEvents.shift();
-            cmi_element = params[0];
-            value = params[1];
-            if (!uncachedValues.includes(cmi_element)) {
-                // Update the local scorm data copy to fetch results faster with get_value
-                settings.scorm_data[cmi_element] = value;
+        pendingValues = {};
+        hasPendingValues = false;
+        clearTimeout(flushTimeout);
+        flushTimeout = null;
+        return {
+            'session': sessionId,
+            'sequence': sequence,
+            'values': values
+        };
+    }
+    function requeueValues(batch) {
+        // Values of a failed batch are sent again, unless they were set again or sent
+        // by a more recent batch in the meantime
+        for (var i = 0; i < batch.values.length; i += 1) {
+            var cmi_element = batch.values[i].name;
+            if (!(cmi_element in pendingValues) && sentSequences[cmi_element] === batch.sequence) {
+                pendingValues[cmi_element] = batch.values[i].value;
+                hasPendingValues = true;
             }
-            data.push({
-                'name': cmi_element,
-                'value': value
-            })
         }
+        if (hasPendingValues && flushTimeout === null) {
+            // Retry after the flush interval, and not right away, as the server might be
+            // unavailable
+            flushTimeout = setTimeout(onFlushTimeout, Math.max(flushInterval, 1) * 1000);
+        }
+    }
+    function onFlushTimeout() {
+        // The timer is reset before anything else, such that values that cannot be sent
+        // right away, because requests are running, can schedule another flush.
+        flushTimeout = null;
+        flushValues();
+    }
+    function flushValues() {
+        if (runningRequests >= maxRunningRequests || !hasPendingValues) {
+            // Values that are set while requests are running are sent once one completes
+            return;
+        }
+        sendBatch(popPendingValues());
+    };
+    function sendBatch(batch, async) {
+        runningRequests += 1;
+        runningBatches[batch.sequence] = batch;
+        var failed = false;
         $.ajax({
             type: "POST",
             url: setValuesUrl,
-            data: JSON.stringify(data),
+            data: JSON.stringify(batch),
+            async: async !== false,
             success: function (results) {
-                for (var i = 0; i < results.length; i += 1) {
-                    var result = results[i];
-                    if (typeof result.grade != "undefined") {
-                        // Properly display at most two decimals
-                        $(element).find(".grade").html(Math.round(result.grade * 100) / 100);
-                    }
-                    $(element).find(".completion-status").html(result.completion_status);
+                applyResults(batch, results);
+            },
+            error: function (xhr) {
+                // Network and server errors are transient, but invalid batches are not
+                if (xhr.status === 0 || xhr.status >= 500) {
+                    failed = true;
+                    requeueValues(batch);
                 }
             },
             complete: function () {
-                // Recursive call to itself
-                processSetValueQueueItems();
+                completeBatch(batch, failed);
             }
         });
-    };
+    }
+    function completeBatch(batch, failed) {
+        runningRequests -= 1;
+        delete runningBatches[batch.sequence];
+        if (finishing && runningRequests === 0) {
+            finishing = false;
+            sendFinalValues();
+        } else if (!failed) {
+            flushValues();
+        }
+    }
+    function applyResults(batch, results) {
+        if (batch.sequence < lastResultSequence) {
+            // The results of a more recent batch were already received
+            return;
+        }
+        lastResultSequence = batch.sequence;
+        for (var i = 0; i < results.length; i += 1) {
+            var result = results[i];
+            if (typeof result.grade != "undefined") {
+                // Properly display at most two decimals
+                $(element).find(".grade").html(Math.round(result.grade * 100) / 100);
+            }
+            $(element).find(".completion-status").html(result.completion_status);
+            if (typeof result.authoritative_values != "undefined") {
+                authoritativeValues = result.authoritative_values;
+            }
+        }
+    }
+    // The last values of the session are sent with requests that outlive the page, such
+    // that they are not lost when the package is closed.
+    function finishValues() {
+        if (maxRunningRequests === 1 && runningRequests > 0) {
+            // With a backend that saves all values at once, concurrent batches would
+            // overwrite one another: the last values are sent once the running batch
+            // completes.
+            finishing = true;
+            return;
+        }
+        sendFinalValues();
+    }
+    function sendFinalValues() {
+        if (!hasPendingValues) {
+            return;
+        }
+        var batch = popPendingValues();
+        if (maxRunningRequests === 1) {
+            // The page may be closed before the running batch completes, and that batch
+            // could then overwrite this one: its values are sent again.
+            var runningValues = [];
+            for (var runningSequence in runningBatches) {
+                var runningBatch = runningBatches[runningSequence];
+                for (var i = 0; i < runningBatch.values.length; i += 1) {
+                    var cmi_element = runningBatch.values[i].name;
+                    if (sentSequences[cmi_element] === runningBatch.sequence) {
+                        runningValues.push(runningBatch.values[i]);
+                        sentSequences[cmi_element] = batch.sequence;
+                    }
+                }
+            }
+            batch.values = runningValues.concat(batch.values);
+        }
+        if (window.fetch) {
+            runningRequests += 1;
+            runningBatches[batch.sequence] = batch;
+            var failed = false;
+            fetch(setValuesUrl, {
+                method: "POST",
+                body: JSON.stringify(batch),
+                // Unlike $.ajax, fetch does not include the csrf token of the platform
+                headers: {
+                    "Content-Type": "application/json",
+                    "X-CSRFToken": getCookie("csrftoken")
+                },
+                credentials: "same-origin",
+                keepalive: true
+            }).then(function (response) {
+                if (response.ok) {
+                    return response.json().then(function (results) {
+                        applyResults(batch, results);
+                    });
+                }
+                if (response.status >= 500) {
+                    failed = true;
+                    requeueValues(batch);
+                }
+            }, function () {
+                failed = true;
+                requeueValues(batch);
+            }).then(function () {
+                completeBatch(batch, failed);
+            });
+        } else {
+            // Beacons cannot include the csrf token: the values are sent synchronously,
+            // such that the request is complete before the page is unloaded.
+            sendBatch(batch, false);
+        }
+    }
+    function getCookie(name) {
+        var cookies = document.cookie ? document.cookie.split(";") : [];
+        for (var i = 0; i < cookies.length; i += 1) {
+            var cookie = cookies[i].trim();
+            if (cookie.indexOf(name + "=") === 0) {
+                return decodeURIComponent(cookie.substring(name.length + 1));
+            }
+        }
+        return "";
+    }
+    function flushValuesOnUnload() {
+        // Regular requests may be cancelled when the page is closed. The page may not run
+        // any script after this, so the last values are sent right away.
+        sendFinalValues();
+    }
+    window.addEventListener("pagehide", flushValuesOnUnload);
+    document.addEventListener("visibilitychange", function () {
+        if (document.visibilityState === "hidden") {
+            flushValuesOnUnload();
+        }
+    });
 
     $(function ($) {
-        initScorm(settings.scorm_version, GetValue, SetValue);
+        initScorm(settings.scorm_version, GetValue, SetValue, flushValues, finishValues);
         initFullscreen();
         initPopupWindow();
         initReports();
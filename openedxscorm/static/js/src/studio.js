@@ -1,6 +1,76 @@
-function ScormStudioXBlock(runtime, element) {
+function ScormStudioXBlock(runtime, element, settings) {
 
     var handlerUrl = runtime.handlerUrl(element, 'studio_submit');
+    var processingStatusUrl = runtime.handlerUrl(element, 'package_processing_status');
+    var processingElement = $(element).find('.scorm-processing');
+
+    function notifyErrors(errors) {
+        errors.forEach(function (error) {
+            runtime.notify("error", {
+                "message": error,
+                "title": "Scorm component save error"
+            });
+        });
+    }
+
+    // Packages may be processed in the background: poll their status until they are
+    // ready. Polling stops after too many consecutive errors, or when processing takes
+    // too long, for instance because the job was lost.
+    var processingPollInterval = 2000;
+    var maxProcessingPollErrors = 5;
+    var maxProcessingPollDuration = 2 * 3600 * 1000;
+    function pollProcessingStatus(startedAt, errorCount) {
+        startedAt = startedAt || Date.now();
+        errorCount = errorCount || 0;
+        if (Date.now() - startedAt > maxProcessingPollDuration) {
+            stopProcessing(["Package processing did not complete, please upload it again"]);
+            return;
+        }
+        $.ajax({
+            url: processingStatusUrl,
+            type: "POST",
+            data: JSON.stringify({}),
+            dataType: 'json',
+            success: function (state) {
+                if (state.status === "pending" || state.status === "processing") {
+                    showProcessingProgress(state);
+                    setTimeout(function () {
+                        pollProcessingStatus(startedAt, 0);
+                    }, processingPollInterval);
+                    return;
+                }
+                stopProcessing(state.errors);
+            },
+            error: function () {
+                if (errorCount + 1 >= maxProcessingPollErrors) {
+                    stopProcessing(["Could not retrieve the status of package processing"]);
+                    return;
+                }
+                setTimeout(function () {
+                    pollProcessingStatus(startedAt, errorCount + 1);
+                }, processingPollInterval);
+            }
+        });
+    }
+    function stopProcessing(errors) {
+        processingElement.hide();
+        if (errors.length > 0) {
+            notifyErrors(errors);
+        } else {
+            runtime.notify('save', {
+                state: 'end'
+            });
+        }
+    }
+    function showProcessingProgress(state) {
+        processingElement.show();
+        if (state.total_bytes) {
+            processingElement.find("progress").val(Math.round(100 * state.bytes / state.total_bytes));
+        }
+        if (state.total_files) {
+            processingElement.find(".scorm-processing-files").text(state.files + " / " + state.total_files);
+        }
+    }
 
     $(element).find('.save-button').bind('click', function () {
         var form_data = new FormData();
@@ -43,12 +113,9 @@ function ScormStudioXBlock(runtime, element) {
             },
             success: function (response) {
                 if (response.errors.length > 0) {
-                    response.errors.forEach(function (error) {
-                        runtime.notify("error", {
-                            "message": error,
-                            "title": "Scorm component save error"
-                        });
-                    });
+                    notifyErrors(response.errors);
+                } else if (response.processing) {
+                    pollProcessingStatus();
                 } else {
                     runtime.notify('save', {
                         state: 'end'
@@ -59,6 +126,13 @@ function ScormStudioXBlock(runtime, element) {
 
     });
 
+    if (settings && settings.package_processing) {
+        runtime.notify('save', {
+            state: 'start'
+        });
+        pollProcessingStatus();
+    }
+
     $(element).find('.cancel-button').bind('click', function () {
         runtime.notify('cancel', {});
     });
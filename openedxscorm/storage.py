@@ -6,6 +6,10 @@ import os
 from django.conf import settings
 
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+# Maximum number of objects that can be deleted by a single S3 request
+DELETE_BATCH_SIZE = 1000
 
 
 class S3ScormStorage(S3Boto3Storage):
@@ -25,6 +29,68 @@ class S3ScormStorage(S3Boto3Storage):
             querystring_expire=querystring_expire,
         )
 
+    def copy(self, source, destination):
+        """
+        Copy a file within the bucket, without downloading it, and return the name of
+        the copy.
+        """
+        destination = self.get_available_name(destination)
+        extra_args = {"ACL": self.default_acl} if self.default_acl else None
+        self.bucket.copy(
+            {
+                "Bucket": self.bucket.name,
+                "Key": self._normalize_name(clean_name(source)),
+            },
+            self._normalize_name(clean_name(destination)),
+            ExtraArgs=extra_args,
+        )
+        return destination
+
+    def read_range(self, name, start, end, chunk_size):
+        """
+        Stream the bytes of a file from `start` to `end` (excluded), in chunks, with a
+        ranged request. Unlike `open`, this does not download the whole file.
+        """
+        if end <= start:
+            return
+        body = self.bucket.Object(self._normalize_name(clean_name(name))).get(
+            Range=f"bytes={start}-{end - 1}"
+        )["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def download(self, name, fileobj):
+        """
+        Stream a file to a file object, such as a temporary file on disk. Unlike `open`,
+        this does not load the whole file in memory.
+        """
+        self.bucket.Object(self._normalize_name(clean_name(name))).download_fileobj(
+            fileobj
+        )
+
+    def delete_many(self, names):
+        """
+        Delete files in batches, with a single request per batch.
+        """
+        for start in range(0, len(names), DELETE_BATCH_SIZE):
+            response = self.bucket.delete_objects(
+                Delete={
+                    "Objects": [
+                        {"Key": self._normalize_name(clean_name(name))}
+                        for name in names[start : start + DELETE_BATCH_SIZE]
+                    ],
+                    "Quiet": True,
+                }
+            )
+            errors = response.get("Errors")
+            if errors:
+                raise OSError(
+                    f"Failed to delete {len(errors)} files, such as"
+                    f" '{errors[0]['Key']}': {errors[0]['Message']}"
+                )
+
 
 def s3(xblock):
     """
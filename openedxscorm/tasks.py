@@ -0,0 +1,46 @@
+"""
+Celery tasks for background processing of scorm packages.
+"""
+
+import logging
+
+from .scormxblock import thread_executor
+
+try:
+    from celery import shared_task
+    from opaque_keys.edx.keys import UsageKey
+    from xmodule.modulestore import ModuleStoreEnum
+    from xmodule.modulestore.django import modulestore
+except ImportError:
+    shared_task = None
+
+
+logger = logging.getLogger(__name__)
+
+
+if shared_task is not None:
+
+    @shared_task
+    def process_package(usage_id, job_id, package_meta, package_path):
+        """
+        Load the xblock from the modulestore and process its uploaded package.
+        """
+        store = modulestore()
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            xblock = store.get_item(UsageKey.from_string(usage_id))
+        xblock.process_package(job_id, package_meta, package_path)
+
+
+def celery_executor(xblock, job_id, package_meta, package_path):
+    """
+    Process packages in Celery workers. This requires that this module is imported by
+    the workers, for instance by adding it to CELERY_IMPORTS. When Celery is not
+    available, packages are processed in a pool of threads of the current process.
+    """
+    if shared_task is None:
+        logger.warning("Celery is not available, processing scorm package in a thread")
+        thread_executor(xblock, job_id, package_meta, package_path)
+        return
+    process_package.delay(
+        str(xblock.scope_ids.usage_id), job_id, package_meta, package_path
+    )
@@ -1,30 +1,174 @@
 # -*- coding: utf-8 -*-
+import gzip
+import io
 import json
+import os
+import time
+import timeit
 import unittest
+import zipfile
+import zlib
 
 
 from ddt import ddt, data
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
 from freezegun import freeze_time
 import mock
+from webob import Request
 from xblock.field_data import DictFieldData
 
-from .scormxblock import ScormXBlock
+from .scormxblock import (
+    ASSET_INDEX_CACHE,
+    RESOURCES_CACHE,
+    ScormError,
+    ScormXBlock,
+    delete_files,
+    index_basenames,
+    list_files,
+    parse_byte_ranges,
+)
+
+if not settings.configured:
+    settings.configure(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+        INSTALLED_APPS=[
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "openedxscorm",
+        ],
+    )
+    django.setup()
+
+
+def patch_xblock_settings(xblock_settings=None):
+    """
+    Patch the settings of all xblocks, either as a decorator or as a context manager.
+    """
+    return mock.patch(
+        "openedxscorm.ScormXBlock.xblock_settings",
+        new_callable=mock.PropertyMock,
+        return_value={} if xblock_settings is None else xblock_settings,
+    )
 
 
 @ddt
 class ScormXBlockTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command("migrate", verbosity=0)
+
+    def setUp(self):
+        cache.clear()
+        ASSET_INDEX_CACHE.clear()
+
     @staticmethod
     def make_one(**kw):
         """
         Creates a ScormXBlock for testing purpose.
         """
         field_data = DictFieldData(kw)
-        block = ScormXBlock(mock.Mock(), field_data, mock.Mock())
+        runtime = mock.Mock()
+        block = ScormXBlock(runtime, field_data, mock.Mock())
         block.location = mock.Mock(
             block_id="block_id", org="org", course="course", block_type="block_type"
         )
+
+        def construct_xblock_from_class(cls, scope_ids, field_data):
+            copy = cls(runtime, field_data, scope_ids)
+            copy.location = block.location
+            copy._storage = block._storage
+            return copy
+
+        runtime.construct_xblock_from_class = construct_xblock_from_class
         return block
 
+    @staticmethod
+    def make_package(files):
+        """
+        Creates an uploaded package file with the given files.
+        """
+        package_file = io.BytesIO()
+        with zipfile.ZipFile(package_file, "w") as scorm_zipfile:
+            for name, content in files.items():
+                scorm_zipfile.writestr(name, content)
+        package_file.name = "package.zip"
+        package_file.seek(0)
+        return package_file
+
+    @staticmethod
+    def make_studio_submit_request(package_file):
+        """
+        Creates a studio_submit request that uploads the given package file.
+        """
+        return mock.Mock(
+            method="POST",
+            params={
+                "display_name": "Test Block",
+                "has_score": "1",
+                "file": mock.Mock(file=package_file),
+                "width": "",
+                "height": "",
+                "enable_navigation_menu": "0",
+                "enable_fullscreen_button": "1",
+                "navigation_menu_width": "",
+                "weight": "1",
+                "popup_on_launch": "0",
+            },
+        )
+
+    @staticmethod
+    def mock_storage(files):
+        """
+        Creates a storage mock that stores files in the given dict.
+        """
+
+        def save(name, content):
+            files[name] = content.read()
+            return name
+
+        def copy(source, destination):
+            files[destination] = files[source]
+            return destination
+
+        def listdir(path):
+            directories, filenames = set(), []
+            for name in files:
+                if name.startswith(path + "/"):
+                    parts = name[len(path) + 1:].split("/")
+                    if len(parts) > 1:
+                        directories.add(parts[0])
+                    else:
+                        filenames.append(parts[0])
+            return sorted(directories), filenames
+
+        # Storages do not implement bulk deletion unless explicitly defined
+        return mock.Mock(
+            spec=["copy", "delete", "exists", "listdir", "open", "save", "size"],
+            copy=mock.Mock(side_effect=copy),
+            exists=mock.Mock(side_effect=lambda name: name in files),
+            open=mock.Mock(side_effect=lambda name: io.BytesIO(files[name])),
+            save=mock.Mock(side_effect=save),
+            delete=mock.Mock(side_effect=lambda name: files.pop(name, None)),
+            listdir=mock.Mock(side_effect=listdir),
+            size=mock.Mock(side_effect=lambda name: len(files[name])),
+        )
+
+    @staticmethod
+    def set_asset_index(block, asset_index):
+        ASSET_INDEX_CACHE[block.asset_index_path] = {
+            "files": asset_index,
+            "basenames": index_basenames(asset_index),
+        }
+
     def test_fields_xblock(self):
         block = self.make_one()
         self.assertEqual(block.display_name, "Scorm")
@@ -255,14 +399,1162 @@ class ScormXBlockTests(unittest.TestCase):
 
         self.assertEqual(response.json, {"value": 20})
 
-    def test_scorm_data_has_user_info_in_student_view(self):
+    @patch_xblock_settings()
+    def test_scorm_set_values_returns_authoritative_values(self, xblock_settings):
+        block = self.make_one(has_score=True)
+
+        response = block.scorm_set_values(
+            mock.Mock(
+                method="POST",
+                body=json.dumps(
+                    [
+                        {"name": "cmi.core.lesson_status", "value": "passed"},
+                        {"name": "cmi.core.score.raw", "value": "80"},
+                    ]
+                ).encode(),
+            )
+        )
+
+        first_result, last_result = response.json
+        self.assertNotIn("authoritative_values", first_result)
+        self.assertEqual(
+            last_result["authoritative_values"],
+            {
+                "cmi.core.lesson_status": "completed",
+                "cmi.completion_status": "completed",
+                "cmi.success_status": "passed",
+                "cmi.core.score.raw": 80,
+                "cmi.score.raw": 80,
+                "cmi.score.scaled": 0.8,
+            },
+        )
+
+    @patch_xblock_settings()
+    def test_scorm_set_values_publishes_events_once(self, xblock_settings):
+        block = self.make_one(has_score=True, weight=2)
+
+        response = block.scorm_set_values(
+            mock.Mock(
+                method="POST",
+                body=json.dumps(
+                    [
+                        {"name": "cmi.core.lesson_status", "value": "passed"},
+                        {"name": "cmi.core.score.raw", "value": "80"},
+                        {"name": "cmi.success_status", "value": "passed"},
+                    ]
+                ).encode(),
+            )
+        )
+
+        self.assertEqual(
+            [result["result"] for result in response.json], ["success"] * 3
+        )
+        self.assertEqual(response.json[1]["grade"], 1.6)
+        self.assertEqual(
+            block.runtime.publish.call_args_list,
+            [
+                mock.call(block, "completion", {"completion": 1}),
+                mock.call(block, "grade", {"value": 1.6, "max_value": 2}),
+            ],
+        )
+
+    @data(
+        ({}, [0.01, 0.12, 0.5, 1]),
+        (
+            {"PROGRESS_COMPLETION_MIN_DELTA": 0.5, "PROGRESS_COMPLETION_THRESHOLDS": [0.1]},
+            [0.01, 0.12, 1],
+        ),
+        ({"PROGRESS_COMPLETION_MIN_DELTA": 0}, [0.01, 0.05, 0.12, 0.15, 0.5, 1]),
+    )
+    def test_progress_measure_completion_is_throttled(self, value):
+        xblock_settings, published = value
+        block = self.make_one()
+
+        with patch_xblock_settings(xblock_settings):
+            for progress in ["0.01", "0.05", "0.12", "0.15", "0.5", "1"]:
+                block.set_value({"name": "cmi.progress_measure", "value": progress})
+
+        self.assertEqual(
+            [call[0][2]["completion"] for call in block.runtime.publish.call_args_list],
+            published,
+        )
+        self.assertEqual(block.last_completion, 1)
+
+    @patch_xblock_settings()
+    @mock.patch("openedxscorm.ScormXBlock.render_template", return_value="")
+    def test_scorm_data_has_user_info_in_student_view(
+        self, render_template, xblock_settings
+    ):
+        block = self.make_one(
+            scorm_data={"cmi.core.lesson_status": "incomplete"}, lesson_status="incomplete"
+        )
+        block.runtime.service.return_value.get_current_user.return_value.opt_attrs = {
+            "edx-platform.user_id": 1,
+            "edx-platform.username": "learner",
+        }
+
+        fragment = block.student_view()
+        self.assertEqual(
+            {
+                "cmi.core.lesson_status": "incomplete",
+                "cmi.core.student_id": 1,
+                "cmi.learner_id": 1,
+                "cmi.learner_name": "learner",
+                "cmi.core.student_name": "learner",
+            },
+            fragment.json_init_args["scorm_data"],
+        )
+        # Learner state is left unchanged, even when values are set again
+        self.assertEqual({"cmi.core.lesson_status": "incomplete"}, block.scorm_data)
+        block.set_value({"name": "cmi.core.lesson_status", "value": "incomplete"})
+        self.assertEqual([], block._get_fields_to_save())
+
+    @patch_xblock_settings()
+    @mock.patch("openedxscorm.ScormXBlock.render_template", return_value="")
+    def test_scorm_data_is_loaded_lazily(self, render_template, xblock_settings):
+        interactions = {
+            f"cmi.interactions.{index}.learner_response": "response" * 100
+            for index in range(10)
+        }
+        block = self.make_one(
+            scorm_data=dict(
+                interactions, **{"cmi.location": "1", "cmi.interactions._count": 10}
+            )
+        )
+
+        fragment = block.student_view()
+        self.assertEqual("1", fragment.json_init_args["scorm_data"]["cmi.location"])
+        # Counts are read on startup, so they are embedded without their elements
+        self.assertEqual(
+            10, fragment.json_init_args["scorm_data"]["cmi.interactions._count"]
+        )
+        self.assertNotIn(
+            "cmi.interactions.0.learner_response",
+            fragment.json_init_args["scorm_data"],
+        )
+
+        request = Request.blank(
+            "/?prefix=cmi.interactions", headers={"Accept-Encoding": "gzip"}
+        )
+        response = block.scorm_get_values(request, "")
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertEqual(
+            dict(interactions, **{"cmi.interactions._count": 10}),
+            json.loads(gzip.decompress(response.body)),
+        )
+
+        request.headers["If-None-Match"] = response.headers["ETag"]
+        self.assertEqual(304, block.scorm_get_values(request, "").status_code)
+
+    @patch_xblock_settings()
+    def test_large_values_are_compressed(self, xblock_settings):
+        suspend_data = "0123456789" * 1000
+        ambiguous_value = "zlib+base64:abc"
+        block = self.make_one(scorm_data={"cmi.suspend_data": "uncompressed"})
+
+        self.assertEqual(
+            {"value": "uncompressed"},
+            block.scorm_get_value(
+                mock.Mock(
+                    method="POST",
+                    body=json.dumps({"name": "cmi.suspend_data"}).encode(),
+                )
+            ).json,
+        )
+        block.set_value({"name": "cmi.suspend_data", "value": suspend_data})
+        block.set_value({"name": "cmi.location", "value": ambiguous_value})
+
+        self.assertTrue(block.scorm_data["cmi.suspend_data"].startswith("zlib+base64:"))
+        self.assertLess(len(block.scorm_data["cmi.suspend_data"]), 1000)
+        self.assertNotEqual(ambiguous_value, block.scorm_data["cmi.location"])
+        self.assertEqual(
+            {"cmi.suspend_data": suspend_data, "cmi.location": ambiguous_value},
+            block.scorm_data_backend.get_all(),
+        )
+        self.assertEqual(
+            {"value": suspend_data},
+            block.scorm_get_value(
+                mock.Mock(
+                    method="POST",
+                    body=json.dumps({"name": "cmi.suspend_data"}).encode(),
+                )
+            ).json,
+        )
+
+    # Databases such as MySQL cannot upsert on a given set of unique fields
+    @data(True, False)
+    @patch_xblock_settings({"SCORM_DATA_BACKEND": "openedxscorm.scorm_data.database"})
+    def test_database_scorm_data_backend(
+        self, supports_update_conflicts_with_target, xblock_settings
+    ):
+        # Models can only be imported once django is setup
+        from django.contrib.auth.models import User
+        from .models import ScormDataElement
+
+        user = User.objects.create(
+            username=f"learner-{supports_update_conflicts_with_target}"
+        )
+        features = mock.patch.object(
+            connection.features,
+            "supports_update_conflicts_with_target",
+            supports_update_conflicts_with_target,
+        )
+        features.start()
+        self.addCleanup(features.stop)
+
+        def make_block(**kw):
+            block = self.make_one(**kw)
+            block.scope_ids.user_id = user.id
+            block.scope_ids.usage_id = "usage_id"
+            return block
+
+        # Legacy data is moved to the table on first access
+        block = make_block(
+            scorm_data={"cmi.location": "1", "cmi.suspend_data": "legacy"}
+        )
+        block.set_value({"name": "cmi.location", "value": "2"})
+        self.assertEqual({}, block.scorm_data)
+        self.assertEqual(
+            {"cmi.location": '"2"', "cmi.suspend_data": '"legacy"'},
+            dict(
+                ScormDataElement.objects.filter(user=user).values_list("element", "value")
+            ),
+        )
+
+        # Only modified elements are written
+        for value, writes in [("3", 1), ("3", 0)]:
+            block = make_block()
+            with CaptureQueriesContext(connection) as queries:
+                block.set_value({"name": "cmi.location", "value": value})
+            self.assertEqual(
+                writes,
+                len(
+                    [
+                        query
+                        for query in queries
+                        if query["sql"].startswith(("INSERT", "UPDATE"))
+                    ]
+                ),
+            )
+
+        # Values are read through the backend
+        block = make_block()
+        response = block.scorm_get_value(
+            mock.Mock(
+                method="POST", body=json.dumps({"name": "cmi.location"}).encode()
+            )
+        )
+        self.assertEqual({"value": "3"}, response.json)
+        self.assertEqual(
+            {"cmi.location": "3"},
+            make_block().scorm_data_backend.get_many(["cmi.location", "cmi.core"]),
+        )
+        block.runtime.user_is_staff = True
+        with mock.patch("openedxscorm.scormxblock.StudentModule") as student_module:
+            student_module.objects.filter.return_value.get.return_value.state = "{}"
+            response = block.scorm_get_student_state(
+                mock.Mock(params={"id": str(user.id)}), ""
+            )
+        self.assertEqual(
+            {"cmi.location": "3", "cmi.suspend_data": "legacy"}, response.json
+        )
+
+    @patch_xblock_settings({"SCORM_DATA_BACKEND": "openedxscorm.scorm_data.database"})
+    def test_stale_values_are_rejected(self, xblock_settings):
+        # Models can only be imported once django is setup
+        from django.contrib.auth.models import User
+        from .scorm_data import DatabaseScormData
+
+        user = User.objects.create(username="concurrent-learner")
+
+        def set_values(session, sequence, values):
+            block = self.make_one()
+            block.scope_ids.user_id = user.id
+            block.scope_ids.usage_id = "usage_id"
+            response = block.scorm_set_values(
+                mock.Mock(
+                    method="POST",
+                    body=json.dumps(
+                        {
+                            "session": session,
+                            "sequence": sequence,
+                            "values": [
+                                {"name": name, "value": value}
+                                for name, value in values.items()
+                            ],
+                        }
+                    ).encode(),
+                )
+            )
+            return [result["result"] for result in response.json], block
+
+        set_values("session", 2, {"cmi.location": "2"})
+        # Batches that arrive out of order do not overwrite more recent values
+        results, _block = set_values(
+            "session", 1, {"cmi.location": "1", "cmi.suspend_data": "1"}
+        )
+        self.assertEqual(["stale", "success"], results)
+        # Batches can be sent again
+        results, _block = set_values("session", 2, {"cmi.location": "2"})
+        self.assertEqual(["success"], results)
+        # Other sessions are not affected
+        results, block = set_values("other", 1, {"cmi.suspend_data": "other"})
+        self.assertEqual(["success"], results)
+        self.assertEqual(
+            {"cmi.location": "2", "cmi.suspend_data": "other"},
+            block.scorm_data_backend.get_all(),
+        )
+
+        # Rows that are created concurrently by a more recent batch are not overwritten
+        backend = DatabaseScormData(user.id, "usage_id")
+        with backend.write(session="session", sequence=3, names=["cmi.exit"]) as stale:
+            self.assertEqual(set(), stale)
+            results, _block = set_values("session", 4, {"cmi.exit": "suspend"})
+            self.assertEqual(["success"], results)
+            backend.set("cmi.exit", "logout")
+        self.assertEqual("suspend", DatabaseScormData(user.id, "usage_id").get("cmi.exit"))
+
+        # Invalid sessions are rejected before anything is written
+        response = block.scorm_set_values(
+            mock.Mock(
+                method="POST",
+                body=json.dumps(
+                    {
+                        "session": "s" * 65,
+                        "sequence": 1,
+                        "values": [{"name": "cmi.location", "value": "3"}],
+                    }
+                ).encode(),
+            )
+        )
+        self.assertEqual(400, response.status_code)
+
+    @patch_xblock_settings()
+    def test_extract_package_builds_asset_index(self, xblock_settings):
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        block._storage = mock.Mock(
+            exists=mock.Mock(return_value=False),
+            save=mock.Mock(side_effect=lambda name, content: name),
+        )
+        package_file = io.BytesIO()
+        with zipfile.ZipFile(package_file, "w") as scorm_zipfile:
+            scorm_zipfile.writestr("package/imsmanifest.xml", "<manifest/>")
+            scorm_zipfile.writestr("package/a/index.html", "<html/>")
+            scorm_zipfile.writestr("package/b/index.html", "<html></html>")
+
+        block.extract_package(package_file)
+
+        extract_folder_path = block.extract_folder_path
+        expected_index = {
+            "files": {
+                "imsmanifest.xml": {
+                    "key": f"{extract_folder_path}/imsmanifest.xml",
+                    "size": 11,
+                    "crc": zlib.crc32(b"<manifest/>"),
+                },
+                "a/index.html": {
+                    "key": f"{extract_folder_path}/a/index.html",
+                    "size": 7,
+                    "crc": zlib.crc32(b"<html/>"),
+                },
+                "b/index.html": {
+                    "key": f"{extract_folder_path}/b/index.html",
+                    "size": 13,
+                    "crc": zlib.crc32(b"<html></html>"),
+                },
+            }
+        }
+        index_path, index_content = block._storage.save.call_args[0]
+        self.assertEqual(index_path, f"{extract_folder_path}.json")
+        self.assertEqual(json.loads(index_content.read()), expected_index)
+        self.assertEqual(
+            ASSET_INDEX_CACHE[index_path],
+            dict(
+                expected_index,
+                basenames={
+                    "index.html": "a/index.html",
+                    "imsmanifest.xml": "imsmanifest.xml",
+                },
+            ),
+        )
+
+    @patch_xblock_settings({"EXTRACT_CONCURRENCY": 4})
+    def test_extract_package_in_parallel(self, xblock_settings):
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        storage = {}
+        block._storage = self.mock_storage(storage)
+        save = block._storage.save.side_effect
+
+        def save_or_fail(name, content):
+            if name.endswith("broken.html"):
+                raise IOError("broken")
+            return save(name, content)
+
+        block._storage.save.side_effect = save_or_fail
+        package_file = io.BytesIO()
+        with zipfile.ZipFile(package_file, "w") as scorm_zipfile:
+            scorm_zipfile.writestr("imsmanifest.xml", "<manifest/>")
+            for i in range(20):
+                scorm_zipfile.writestr(f"page{i}.html", f"page {i}")
+
+        block.extract_package(package_file)
+        extract_folder_path = block.extract_folder_path
+        asset_index = json.loads(storage[f"{extract_folder_path}.json"])
+        self.assertEqual(len(asset_index["files"]), 21)
+        self.assertEqual(storage[f"{extract_folder_path}/page12.html"], b"page 12")
+
+        # Uploaded files are removed on failure
+        storage.clear()
+        package_file = io.BytesIO()
+        with zipfile.ZipFile(package_file, "w") as scorm_zipfile:
+            scorm_zipfile.writestr("imsmanifest.xml", "<manifest/>")
+            scorm_zipfile.writestr("page.html", "page")
+            scorm_zipfile.writestr("broken.html", "broken")
+        with self.assertRaises(IOError):
+            block.extract_package(package_file)
+        self.assertEqual(storage, {})
+
+    @data(({}, 1), ({"CACHE_RESOURCES": False}, 2))
+    def test_resources_are_cached(self, value):
+        xblock_settings, load_count = value
+        block = self.make_one()
+        RESOURCES_CACHE.clear()
+        with patch_xblock_settings(xblock_settings), mock.patch(
+            "openedxscorm.scormxblock.Template"
+        ) as template, mock.patch.object(
+            ScormXBlock, "resource_string", wraps=ScormXBlock.resource_string
+        ) as resource_string:
+            block.render_template("static/html/popup.html", {})
+            block.render_template("static/html/popup.html", {})
+            self.assertEqual(
+                block.static_resource("static/js/src/scorm.js"),
+                block.static_resource("static/js/src/scorm.js"),
+            )
+        self.assertEqual(template.call_count, load_count)
+        self.assertEqual(resource_string.call_count, 2 * load_count)
+        RESOURCES_CACHE.clear()
+
+    def test_delete_files(self):
+        storage = {f"scorm/a/{i}.html": b"" for i in range(10)}
+        storage["scorm/a/b/index.html"] = b""
+        storage["scorm/c.json"] = b""
+        file_storage = self.mock_storage(storage)
+
+        delete_files(file_storage, list_files(file_storage, "scorm/a"))
+        self.assertEqual(list(storage), ["scorm/c.json"])
+        self.assertEqual(file_storage.delete.call_count, 11)
+
+        # Storages that support bulk deletion delete all files at once
+        bulk_storage = mock.Mock(spec=["delete", "delete_many"])
+        delete_files(bulk_storage, ["a.html", "b.html"])
+        bulk_storage.delete_many.assert_called_once_with(["a.html", "b.html"])
+        bulk_storage.delete.assert_not_called()
+
+    @patch_xblock_settings({"CONTENT_ADDRESSED_STORAGE": True})
+    def test_content_addressed_storage(self, xblock_settings):
+        storage = {}
+        package_file = io.BytesIO()
+        with zipfile.ZipFile(package_file, "w") as scorm_zipfile:
+            scorm_zipfile.writestr("imsmanifest.xml", "<manifest/>")
+            scorm_zipfile.writestr("index.html", "<html/>")
+        package_file.name = "package.zip"
+
+        blocks = []
+        for block_id in ["block1", "block2"]:
+            block = self.make_one()
+            block.scope_ids = mock.Mock(usage_id=block_id)
+            block._storage = self.mock_storage(storage)
+            package_file.seek(0)
+            block.update_package_meta(package_file)
+            block.extract_package(package_file)
+            blocks.append(block)
+
+        # The package was extracted only once, in a shared folder
+        shared_package_path = blocks[0].shared_package_path(blocks[0].package_meta["sha1"])
+        self.assertEqual(blocks[0].extract_folder_path, shared_package_path)
+        self.assertEqual(blocks[1].extract_folder_path, shared_package_path)
+        self.assertEqual(
+            sorted(storage),
+            [
+                f"{shared_package_path}.json",
+                f"{shared_package_path}/imsmanifest.xml",
+                f"{shared_package_path}/index.html",
+            ],
+        )
+        self.assertEqual(blocks[1]._storage.save.call_count, 0)
+
+        # Copies of a block, for instance duplicated blocks, reference the package
+        copy = self.make_one(package_meta=blocks[0].package_meta)
+        copy.scope_ids = mock.Mock(usage_id="copy")
+        copy._storage = self.mock_storage(storage)
+        self.assertEqual(copy.extract_folder_path, shared_package_path)
+        self.assertFalse(copy.studio_post_duplicate(mock.Mock(), blocks[0]))
+
+        # The package is removed once it is no longer referenced
+        for block in blocks:
+            block.release_shared_package(block.package_meta["sha1"])
+        self.assertEqual(len(storage), 3)
+        copy.release_shared_package(copy.package_meta["sha1"])
+        self.assertEqual(storage, {})
+
+        # The package is extracted again if it is used after it was removed, even if
+        # its index is still cached by another process
+        ASSET_INDEX_CACHE[f"{shared_package_path}.json"] = {"files": {}, "basenames": {}}
+        package_file.seek(0)
+        blocks[0].extract_package(package_file)
+        self.assertIn(f"{shared_package_path}/index.html", storage)
+
+    @patch_xblock_settings()
+    def test_incremental_upload(self, xblock_settings):
+        block = self.make_one()
+        storage = {}
+        block._storage = self.mock_storage(storage)
+
+        def upload(files):
+            package_file = io.BytesIO()
+            with zipfile.ZipFile(package_file, "w") as scorm_zipfile:
+                for name, content in files.items():
+                    scorm_zipfile.writestr(name, content)
+            package_file.name = "package.zip"
+            package_file.seek(0)
+            previous_asset_index = block.get_reusable_asset_index()
+            block.update_package_meta(package_file)
+            block.invalidate_storage_lookups()
+            block.extract_package(package_file, previous_asset_index=previous_asset_index)
+
+        upload({"imsmanifest.xml": "<manifest/>", "index.html": "<html/>"})
+        previous_folder_path = block.extract_folder_path
+        block._storage.save.reset_mock()
+
+        upload({"imsmanifest.xml": "<manifest/>", "index.html": "<html>fixed</html>"})
+        extract_folder_path = block.extract_folder_path
+        self.assertNotEqual(previous_folder_path, extract_folder_path)
+        block._storage.copy.assert_called_once_with(
+            f"{previous_folder_path}/imsmanifest.xml",
+            f"{extract_folder_path}/imsmanifest.xml",
+        )
+        self.assertEqual(
+            [call[0][0] for call in block._storage.save.call_args_list],
+            [f"{extract_folder_path}/index.html", f"{extract_folder_path}.json"],
+        )
+        self.assertEqual(
+            storage[f"{extract_folder_path}/index.html"], b"<html>fixed</html>"
+        )
+        self.assertEqual(
+            sorted(block.get_asset_index()),
+            ["imsmanifest.xml", "index.html"],
+        )
+
+        # Uploading the same package again keeps all files in place
+        block._storage.copy.reset_mock()
+        block._storage.save.reset_mock()
+        upload({"imsmanifest.xml": "<manifest/>", "index.html": "<html>fixed</html>"})
+        block._storage.copy.assert_not_called()
+        self.assertEqual(
+            [call[0][0] for call in block._storage.save.call_args_list],
+            [f"{extract_folder_path}.json"],
+        )
+
+    @patch_xblock_settings()
+    def test_package_swap(self, xblock_settings):
+        block = self.make_one()
+        storage = {}
+        block._storage = self.mock_storage(storage)
+        manifest = '<manifest><resources><resource href="index.html"/></resources></manifest>'
+
+        def upload(files):
+            return json.loads(
+                block.studio_submit(
+                    self.make_studio_submit_request(self.make_package(files)), ""
+                ).body
+            )
+
+        with freeze_time("2026-10-01"):
+            upload({"imsmanifest.xml": manifest, "index.html": "v1"})
+            first_folder_path = block.extract_folder_path
+            first_sha1 = block.package_meta["sha1"]
+            response = upload({"imsmanifest.xml": manifest, "index.html": "v2"})
+        self.assertEqual(response["errors"], [])
+        second_folder_path = block.extract_folder_path
+        self.assertEqual(storage[f"{second_folder_path}/index.html"], b"v2")
+        # The previous package is still available, and it is recorded outside of the
+        # block
+        self.assertEqual(storage[f"{first_folder_path}/index.html"], b"v1")
+        self.assertEqual(block.find_retired_package(first_sha1), first_folder_path)
+        with freeze_time("2026-10-07"):
+            self.assertEqual(block.collect_retired_packages(), [])
+
+        # Invalid packages do not replace the current package
+        with freeze_time("2026-10-02"):
+            response = upload({"index.html": "broken"})
+        self.assertEqual(len(response["errors"]), 1)
+        self.assertEqual(block.extract_folder_path, second_folder_path)
+        self.assertEqual(block.index_page_path, "index.html")
+
+        # Assets of the retired package are still served from its own index
+        response = block.assets_proxy(Request.blank("/"), f"{first_sha1}/index.html")
+        self.assertEqual(response.body, b"v1")
+        self.assertNotIn("no-cache", response.headers["Cache-Control"])
+
+        # Retired packages are removed once the retention period is over, in the
+        # background
+        with freeze_time("2026-10-09"), mock.patch(
+            "openedxscorm.scormxblock.PACKAGE_PROCESSING_POOL"
+        ) as pool:
+            upload({"imsmanifest.xml": manifest, "index.html": "v3"})
+            self.assertIn(f"{first_folder_path}/index.html", storage)
+            func, expired_packages = pool.submit.call_args[0]
+            self.assertEqual(
+                [retired_package.path for retired_package in expired_packages],
+                [first_folder_path],
+            )
+            func(expired_packages)
+        self.assertNotIn(f"{first_folder_path}/index.html", storage)
+        self.assertNotIn(f"{first_folder_path}.json", storage)
+        self.assertEqual(storage[f"{second_folder_path}/index.html"], b"v2")
+        self.assertIsNone(block.find_retired_package(first_sha1))
+        response = block.assets_proxy(Request.blank("/"), f"{first_sha1}/index.html")
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+    @patch_xblock_settings()
+    def test_legacy_package_swap(self, xblock_settings):
+        block = self.make_one(package_meta={"sha1": "legacy"})
+        manifest = '<manifest><resources><resource href="index.html"/></resources></manifest>'
+        legacy_folder_path = block.extract_folder_path
+        storage = {
+            f"{legacy_folder_path}/imsmanifest.xml": manifest.encode(),
+            f"{legacy_folder_path}/index.html": b"legacy",
+        }
+        block._storage = self.mock_storage(storage)
+        block.invalidate_storage_lookups()
+
+        block.studio_submit(
+            self.make_studio_submit_request(
+                self.make_package({"imsmanifest.xml": manifest, "index.html": "v1"})
+            ),
+            "",
+        )
+        # Packages that were extracted without an index are retired as well
+        self.assertEqual(storage[f"{legacy_folder_path}/index.html"], b"legacy")
+        self.assertEqual(block.find_retired_package("legacy"), legacy_folder_path)
+        response = block.assets_proxy(Request.blank("/"), "legacy/index.html")
+        self.assertEqual(response.body, b"legacy")
+
+    @patch_xblock_settings()
+    def test_manifest_is_parsed_from_package(self, xblock_settings):
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        storage = {}
+        block._storage = self.mock_storage(storage)
+        package_file = self.make_package(
+            {
+                "package/imsmanifest.xml": """<?xml version="1.0"?>
+<manifest xmlns="http://www.imsglobal.org/xsd/imscp_v1p1">
+  <metadata><schemaversion>2004 4th Edition</schemaversion></metadata>
+  <organizations>
+    <organization>
+      <title>Course</title>
+      <item identifierref="r2" isvisible="true"><title>Chapter</title></item>
+    </organization>
+  </organizations>
+  <resources>
+    <resource identifier="r1" href="start.html"><file href="start.html"/></resource>
+    <resource identifier="r2" href="chapter.html"/>
+  </resources>
+</manifest>""",
+                "package/start.html": "<html/>",
+            }
+        )
+
+        manifest = block.extract_package(package_file)
+        block.update_package_fields(manifest)
+
+        self.assertEqual(
+            block.package_meta["manifest"],
+            {
+                "schemaversion": "2004 4th Edition",
+                "organizations": [
+                    {
+                        "title": "Course",
+                        "items": [
+                            {
+                                "title": "Chapter",
+                                "identifierref": "r2",
+                                "isvisible": "true",
+                            }
+                        ],
+                    }
+                ],
+                "resources": {
+                    "r1": {"href": "start.html", "files": ["start.html"]},
+                    "r2": {"href": "chapter.html"},
+                },
+                "index_href": "start.html",
+            },
+        )
+        self.assertEqual(block.index_page_path, "start.html")
+        self.assertEqual(block.scorm_version, "SCORM_2004")
+        # The navigation menu is rendered on demand, and cached
+        self.assertEqual(block.navigation_menu, "")
+        with mock.patch.object(
+            block, "render_navigation_menu", wraps=block.render_navigation_menu
+        ) as render_navigation_menu:
+            navigation_menu = block.get_navigation_menu()
+            self.assertEqual(block.get_navigation_menu(), navigation_menu)
+        render_navigation_menu.assert_called_once()
+        self.assertIn("Course", navigation_menu)
+        self.assertIn(f"{block.assets_base_url}/chapter.html'", navigation_menu)
+        # The manifest was not loaded again from the storage
+        block._storage.open.assert_not_called()
+        block._storage.listdir.assert_not_called()
+
+        # The index page is the first resource with an href, in document order, even
+        # when resources do not have identifiers
+        storage.clear()
+        package_file = self.make_package(
+            {
+                "imsmanifest.xml": (
+                    "<manifest><resources><resource/>"
+                    '<resource href="index.html"/></resources></manifest>'
+                ),
+                "index.html": "<html/>",
+            }
+        )
+        manifest = block.extract_package(package_file)
+        self.assertEqual(manifest["resources"], {"": {}})
+        block.update_package_fields(manifest)
+        self.assertEqual(block.index_page_path, "index.html")
+
+        # Invalid manifests are rejected before anything is extracted
+        storage.clear()
+        package_file = self.make_package({"imsmanifest.xml": "<manifest>"})
+        with self.assertRaises(ScormError):
+            block.extract_package(package_file)
+        self.assertEqual(storage, {})
+
+    def test_background_package_processing(self):
+        def process_now(xblock, job_id, package_meta, package_path):
+            self.assertEqual(xblock.package_processing_status(
+                mock.Mock(method="POST", body=b"{}")
+            ).json["status"], "pending")
+            xblock.process_package(job_id, package_meta, package_path)
+
         block = self.make_one()
+        storage = {}
+        block._storage = self.mock_storage(storage)
+        package_file = self.make_package(
+            {
+                "imsmanifest.xml": (
+                    '<manifest><resources><resource href="index.html"/></resources></manifest>'
+                ),
+                "index.html": "<html/>",
+            }
+        )
+
+        with patch_xblock_settings({"PACKAGE_PROCESSING_EXECUTOR": process_now}):
+            with transaction.atomic():
+                response = block.studio_submit(
+                    self.make_studio_submit_request(package_file), ""
+                )
+                # Processing starts once the studio request is committed
+                self.assertEqual(block.package_meta, {})
+            self.assertEqual(
+                json.loads(response.body),
+                {"result": "success", "errors": [], "processing": True},
+            )
+            # The package was applied at the end of processing, without waiting for the
+            # studio to poll for its status
+            self.assertEqual(block.package_meta["name"], "package.zip")
+
+            status = block.package_processing_status(
+                mock.Mock(method="POST", body=b"{}")
+            ).json
+            self.assertEqual(status["status"], "complete")
+            self.assertEqual(status["files"], 2)
+            self.assertEqual(status["total_files"], 2)
+            self.assertEqual(block.package_meta["name"], "package.zip")
+            self.assertEqual(block.index_page_path, "index.html")
+            # The uploaded package was removed
+            self.assertEqual(
+                sorted(storage),
+                [
+                    f"{block.extract_folder_path}.json",
+                    f"{block.extract_folder_path}/imsmanifest.xml",
+                    f"{block.extract_folder_path}/index.html",
+                ],
+            )
+
+    def test_superseded_package_processing_is_discarded(self):
+        block = self.make_one()
+        storage = {}
+        block._storage = self.mock_storage(storage)
+        package_file = self.make_package(
+            {
+                "imsmanifest.xml": (
+                    '<manifest><resources><resource href="index.html"/></resources></manifest>'
+                ),
+                "index.html": "<html/>",
+            }
+        )
+        package_meta = block.get_package_meta(package_file)
+        package_path = block.storage.save("uploads/package.zip", package_file)
+
+        with patch_xblock_settings():
+            # Another package was uploaded in the meantime
+            block.set_processing_state({"id": "other", "status": "pending", "errors": []})
+            block.process_package("job", package_meta, package_path)
+            self.assertEqual(block.get_processing_state()["id"], "other")
+
+        self.assertEqual(block.package_meta, {})
+        # Neither the upload nor the extracted package were left behind
+        self.assertEqual(storage, {})
+
+    @patch_xblock_settings()
+    def test_stalled_package_processing(self, xblock_settings):
+        block = self.make_one()
+        with freeze_time("2026-10-01 10:00"):
+            block.set_processing_state(
+                {
+                    "id": "job",
+                    "status": "processing",
+                    "errors": [],
+                    "started_at": int(time.time()),
+                }
+            )
+        with freeze_time("2026-10-01 10:30"):
+            status = block.package_processing_status(mock.Mock(method="POST", body=b"{}"))
+            self.assertEqual(status.json["status"], "processing")
+        with freeze_time("2026-10-01 11:30"):
+            status = block.package_processing_status(mock.Mock(method="POST", body=b"{}"))
+            self.assertEqual(status.json["status"], "stalled")
+            self.assertEqual(len(status.json["errors"]), 1)
+
+    @data(
+        ({}, "compression ratio of 'bomb.txt' exceeds the maximum ratio of 200"),
+        ({"MAX_COMPRESSION_RATIO": None}, None),
+        (
+            {"MAX_COMPRESSION_RATIO": None, "MAX_UNCOMPRESSED_SIZE": 1024},
+            "exceeds the maximum size of 1024 bytes",
+        ),
+    )
+    def test_extract_package_rejects_large_packages(self, value):
+        xblock_settings, error = value
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        block._storage = mock.Mock(
+            exists=mock.Mock(return_value=False),
+            save=mock.Mock(side_effect=lambda name, content: name),
+        )
+        package_file = io.BytesIO()
+        with zipfile.ZipFile(package_file, "w", zipfile.ZIP_DEFLATED) as scorm_zipfile:
+            scorm_zipfile.writestr("imsmanifest.xml", "<manifest/>")
+            scorm_zipfile.writestr("bomb.txt", b"0" * 10 * 1024 * 1024)
+
+        with patch_xblock_settings(xblock_settings):
+            if error:
+                with self.assertRaises(ScormError) as context:
+                    block.extract_package(package_file)
+                self.assertIn(error, context.exception.args[0])
+                block._storage.save.assert_not_called()
+            else:
+                block.extract_package(package_file)
+                self.assertEqual(block._storage.save.call_count, 3)
+
+    @patch_xblock_settings()
+    def test_assets_proxy_resolves_from_asset_index(self, xblock_settings):
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        block._storage = mock.Mock(
+            spec=["exists", "listdir", "open"],
+            exists=mock.Mock(return_value=False),
+            open=mock.Mock(return_value=io.BytesIO(b"content")),
+        )
+        self.set_asset_index(
+            block,
+            {
+                "a/index.html": {"key": "a/index.html", "size": 7},
+                "b/index.html": {"key": "b/index.html", "size": 7},
+            },
+        )
+
+        response = block.assets_proxy(Request.blank("/"), "b/index.html")
+
+        self.assertEqual(response.body, b"content")
+        block._storage.open.assert_called_once_with("b/index.html")
+        block._storage.listdir.assert_not_called()
+        self.assertEqual(
+            block.assets_proxy(Request.blank("/"), "b/missing.html").status_code, 404
+        )
+        # Unknown paths are matched by file name
+        block._storage.open.return_value = io.BytesIO(b"content")
+        self.assertEqual(
+            block.assets_proxy(Request.blank("/"), "c/index.html").body, b"content"
+        )
+        block._storage.open.assert_called_with("a/index.html")
+
+        # Assets are cached one by one, without the index
+        ASSET_INDEX_CACHE.clear()
+        self.assertEqual(
+            {"key": "b/index.html", "size": 7}, block.find_asset("b/index.html")
+        )
+        self.assertIsNone(block.find_asset("b/missing.html"))
+        self.assertEqual(ASSET_INDEX_CACHE, {})
+
+    # Storages may read ranges of files without opening them
+    @data(False, True)
+    @patch_xblock_settings()
+    def test_assets_proxy_range(self, read_range, xblock_settings):
+        def read_content_range(_path, start, end, chunk_size):
+            for offset in range(start, end, chunk_size):
+                yield b"0123456789"[offset : min(offset + chunk_size, end)]
+
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        block._storage = mock.Mock(
+            spec=["exists", "open"] + (["read_range"] if read_range else []),
+            exists=mock.Mock(return_value=False),
+            open=mock.Mock(side_effect=lambda path: io.BytesIO(b"0123456789")),
+        )
+        if read_range:
+            block._storage.read_range = mock.Mock(side_effect=read_content_range)
+        self.set_asset_index(block, {"video.mp4": {"key": "video.mp4", "size": 10}})
+
+        response = block.assets_proxy(Request.blank("/"), "video.mp4")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.accept_ranges, "bytes")
+        self.assertEqual(response.body, b"0123456789")
+
+        response = block.assets_proxy(
+            Request.blank("/", headers={"Range": "bytes=2-4"}), "video.mp4"
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.headers["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(response.body, b"234")
+
+        response = block.assets_proxy(
+            Request.blank("/", headers={"Range": "bytes=0-1,-2"}), "video.mp4"
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.content_type.startswith("multipart/byteranges"))
+        self.assertIn(b"Content-Range: bytes 0-1/10\r\n\r\n01\r\n", response.body)
+        self.assertIn(b"Content-Range: bytes 8-9/10\r\n\r\n89\r\n", response.body)
+        self.assertEqual(response.content_length, len(response.body))
+
+        response = block.assets_proxy(
+            Request.blank("/", headers={"Range": "bytes=20-"}), "video.mp4"
+        )
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers["Content-Range"], "bytes */10")
+        if read_range:
+            block._storage.open.assert_not_called()
+
+    @patch_xblock_settings()
+    def test_assets_proxy_conditional_get(self, xblock_settings):
+        block = self.make_one(
+            package_meta={"sha1": "sha1", "last_updated": "2018-05-01T00:00:00.000000"}
+        )
+        block._storage = mock.Mock(
+            spec=["exists", "listdir", "open"],
+            exists=mock.Mock(return_value=False),
+            open=mock.Mock(side_effect=lambda path: io.BytesIO(b"content")),
+        )
+        self.set_asset_index(block, {"index.html": {"key": "index.html", "size": 7}})
+
+        response = block.assets_proxy(Request.blank("/"), "sha1/index.html")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.headers["Cache-Control"], "private, max-age=31536000, immutable"
+        )
+        self.assertEqual(
+            response.headers["Last-Modified"], "Tue, 01 May 2018 00:00:00 GMT"
+        )
+        etag = response.headers["ETag"]
+
+        # Unversioned urls must be revalidated
+        response = block.assets_proxy(Request.blank("/"), "index.html")
+        self.assertEqual(response.headers["Cache-Control"], "private, no-cache")
+        self.assertEqual(response.headers["ETag"], etag)
+
+        block._storage.reset_mock()
+        for headers in [
+            {"If-None-Match": etag},
+            {"If-Modified-Since": "Tue, 01 May 2018 00:00:00 GMT"},
+        ]:
+            response = block.assets_proxy(
+                Request.blank("/", headers=headers), "sha1/index.html"
+            )
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(block._storage.method_calls, [])
+
+        response = block.assets_proxy(
+            Request.blank("/", headers={"If-None-Match": '"other"'}), "sha1/index.html"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @patch_xblock_settings({"PRECOMPRESS_ASSETS": True, "PRECOMPRESS_MIN_SIZE": 100})
+    def test_precompressed_assets(self, xblock_settings):
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        storage = {}
+
+        def save(name, content):
+            storage[name] = content.read()
+            return name
+
+        block._storage = mock.Mock(
+            spec=["exists", "listdir", "open", "save"],
+            exists=mock.Mock(return_value=False),
+            save=mock.Mock(side_effect=save),
+            open=mock.Mock(side_effect=lambda name: io.BytesIO(storage[name])),
+        )
+        script = b"var a = 1;\n" * 100
+        package_file = io.BytesIO()
+        with zipfile.ZipFile(package_file, "w") as scorm_zipfile:
+            scorm_zipfile.writestr("imsmanifest.xml", "<manifest/>")
+            scorm_zipfile.writestr("script.js", script)
+            scorm_zipfile.writestr("image.png", script)
+
+        block.extract_package(package_file)
+        asset_index = json.loads(storage[f"{block.extract_folder_path}.json"])
+        self.assertIn("gzip", asset_index["files"]["script.js"]["encodings"])
+        self.assertNotIn("encodings", asset_index["files"]["imsmanifest.xml"])
+        self.assertNotIn("encodings", asset_index["files"]["image.png"])
+
+        response = block.assets_proxy(
+            Request.blank("/", headers={"Accept-Encoding": "gzip, deflate"}),
+            "sha1/script.js",
+        )
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        self.assertTrue(response.headers["ETag"].endswith('-gzip"'))
+        self.assertEqual(gzip.decompress(response.body), script)
+
+        response = block.assets_proxy(
+            Request.blank("/", headers={"Accept-Encoding": "gzip;q=0"}),
+            "sha1/script.js",
+        )
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.body, script)
+
+    @patch_xblock_settings()
+    def test_extract_folder_base_path_is_cached(self, xblock_settings):
+        block = self.make_one(package_meta={"sha1": "sha1"})
+        block._storage = mock.Mock(exists=mock.Mock(return_value=True))
+
+        self.assertEqual(block.extract_folder_base_path, "scorm/block_id")
+        self.assertEqual(block.extract_folder_base_path, "scorm/block_id")
+        block._storage.exists.assert_called_once_with("scorm/block_id/imsmanifest.xml")
+        block._storage.listdir.assert_not_called()
+
+        # Lookups are shared between instances of the same block
+        other_block = self.make_one(package_meta={"sha1": "sha1"})
+        other_block.scope_ids = block.scope_ids
+        other_block._storage = mock.Mock()
+        self.assertEqual(other_block.extract_folder_base_path, "scorm/block_id")
+        other_block._storage.exists.assert_not_called()
+
+        # Old-style folder was removed
+        block._storage.exists.return_value = False
+        block.invalidate_storage_lookups()
+        self.assertEqual(
+            block.extract_folder_base_path, f"scorm/{block.hashed_usage_id}"
+        )
+
+    @data(
+        (None, None),
+        ("items=0-1", None),
+        ("bytes=4-2", None),
+        ("bytes=a-b", None),
+        ("bytes=0-", [(0, 10)]),
+        ("bytes=0-0", [(0, 1)]),
+        ("bytes=5-100", [(5, 10)]),
+        ("bytes=-3", [(7, 10)]),
+        ("bytes=-30", [(0, 10)]),
+        ("bytes=0-1, 4-5", [(0, 2), (4, 6)]),
+        ("bytes=10-", []),
+    )
+    def test_parse_byte_ranges(self, value):
+        header, expected = value
+        self.assertEqual(parse_byte_ranges(header, 10), expected)
+
+
+@unittest.skipUnless(
+    os.environ.get("SCORM_BENCHMARKS"), "Set SCORM_BENCHMARKS=1 to run benchmarks"
+)
+class ScormXBlockBenchmarks(unittest.TestCase):
+    """
+    Benchmarks of performance-sensitive code paths. Results are printed, so run them with:
+
+        SCORM_BENCHMARKS=1 python -m pytest -s openedxscorm/tests.py -k Benchmarks
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_extract_package_concurrency(self):
+        # 500-file package, uploaded to a storage with 10 ms latency per save
+        package_file = ScormXBlockTests.make_package(
+            dict(
+                {"imsmanifest.xml": "<manifest/>"},
+                **{f"page{i}.html": f"page {i}" for i in range(500)},
+            )
+        )
+        durations = {}
+        for concurrency in [1, 8, 32]:
+            block = ScormXBlockTests.make_one(package_meta={"sha1": "sha1"})
+            block._storage = ScormXBlockTests.mock_storage({})
+            save = block._storage.save.side_effect
+
+            def slow_save(name, content, save=save):
+                time.sleep(0.01)
+                return save(name, content)
+
+            block._storage.save.side_effect = slow_save
+            with patch_xblock_settings({"EXTRACT_CONCURRENCY": concurrency}):
+                start = time.perf_counter()
+                block.extract_package(package_file)
+                durations[concurrency] = time.perf_counter() - start
+            package_file.seek(0)
+            print(
+                f"extract_package, concurrency {concurrency}: "
+                f"{durations[concurrency]:.2f} s"
+            )
+        self.assertLess(durations[8], durations[1])
+
+    @override_settings(
+        TEMPLATES=[{"BACKEND": "django.template.backends.django.DjangoTemplates"}]
+    )
+    def test_render_resources(self):
+        # Templates and static resources that are loaded by student_view
+        def render(block):
+            block.render_template(
+                "static/html/scormxblock.html",
+                {
+                    "scorm_xblock": block,
+                    "index_page_url": "",
+                    "completion_status": "",
+                    "grade": 0,
+                    "can_view_student_reports": False,
+                    "navigation_menu": "",
+                    "popup_on_launch": False,
+                },
+            )
+            for path in [
+                "static/css/scormxblock.css",
+                "static/js/src/scorm.js",
+                "static/js/src/scormxblock.js",
+                "static/js/vendor/renderjson.js",
+            ]:
+                block.static_resource(path)
 
-        block.student_view()
-        student_info_keys = [
-            "cmi.core.student_id",
-            "cmi.learner_id",
-            "cmi.learner_name",
-            "cmi.core.student_name",
-        ]
-        self.assertTrue(key in block.scorm_data for key in student_info_keys)
+        durations = {}
+        for cache_resources in [False, True]:
+            RESOURCES_CACHE.clear()
+            block = ScormXBlockTests.make_one()
+            with patch_xblock_settings({"CACHE_RESOURCES": cache_resources}):
+                number = 2000
+                durations[cache_resources] = (
+                    min(timeit.repeat(lambda: render(block), number=number, repeat=5))
+                    / number
+                )
+            print(
+                f"render, CACHE_RESOURCES={cache_resources}: "
+                f"{durations[cache_resources] * 1e6:.1f} us"
+            )
+        self.assertLess(durations[True], durations[False])
@@ -57,10 +57,19 @@ setup(
         "Issue tracker": "https://github.com/overhangio/openedx-scorm-xblock/issues",
         "Community": "https://discuss.openedx.com",
     },
-    packages=["openedxscorm"],
+    packages=[
+        "openedxscorm",
+        "openedxscorm.management",
+        "openedxscorm.management.commands",
+        "openedxscorm.migrations",
+    ],
     python_requires=">=3.8",
     install_requires=["xblock", "web-fragments"],
-    entry_points={"xblock.v1": ["scorm = openedxscorm:ScormXBlock"]},
+    entry_points={
+        "xblock.v1": ["scorm = openedxscorm:ScormXBlock"],
+        "lms.djangoapp": ["openedxscorm = openedxscorm.apps:ScormXBlockConfig"],
+        "cms.djangoapp": ["openedxscorm = openedxscorm.apps:ScormXBlockConfig"],
+    },
     package_data=package_data("openedxscorm", ["static", "public", "locale"]),
     license="AGPLv3",
     classifiers=["License :: OSI Approved :: GNU Affero General Public License v3"],